@@ -0,0 +1,186 @@
+## Ajuste global: um único conjunto de constantes para vários experimentos
+# As constantes do ping-pong bi-bi só ficam bem identificadas quando várias combinações
+# de s0_a/s0_b são ajustadas juntas. Cada candidato é integrado para os N experimentos
+# em uma única chamada de simular_lote.
+import copy
+import time as _time
+
+import numpy as np
+from scipy.optimize import differential_evolution
+
+from funcoes_modelagem_final import (
+    FitResult, ObjetivoCompilado, read_data_from_excel, condicoes_iniciais, kinetic_model, simular_lote,
+    aplicar_refinamento, REFINAMENTO_PADRAO,
+)
+from espaco_parametros import EspacoParametros, objetivo_espaco
+
+class GlobalFitResult:
+    """Constantes compartilhadas, um FitResult por experimento e o custo por experimento."""
+
+    def __init__(self, constantes, resultados, objetivo, nfev, nit, custo):
+        self.constantes = constantes
+        self.resultados = resultados  # Lista de FitResult, na ordem dos experimentos
+        self.objetivo = objetivo      # Soma dos erros de todos os experimentos
+        self.nfev = nfev
+        self.nit = nit
+        self.custo = custo            # Tempos medidos por avaliação (ver medir_custo); None sem medir
+
+    def resumo(self):
+        k1, k_1, k2, k3, k_3, k4 = self.constantes
+        r = self.resultados[0]
+        return (
+            f"Experimentos: {len(self.resultados)}\n"
+            f"k1: {k1:.4f}\nk_1: {k_1:.4f}\nk2: {k2:.4f}\nk3: {k3:.4f}\nk_3: {k_3:.4f}\nk4: {k4:.4f}\n"
+            f"Km_A: {r.Km_A:.4f}\nKm_B: {r.Km_B:.4f}\n"
+            f"Objetivo: {self.objetivo:.4g}\nAvaliações: {self.nfev}\nIterações: {self.nit}"
+        ) + (
+            f"\nCusto por experimento: {self.custo['ms_por_experimento']:.3f} ms "
+            f"({self.custo['razao_solucao_unica']:.2f}x uma integração isolada)" if self.custo is not None else ""
+        )
+
+#Lê os experimentos e monta a grade de tempo comum usada na integração em lote
+def preparar_dados(experimentos):
+    """experimentos: lista de {arquivo, E0, s0_a, s0_b} (mesmo formato de ajuste_lote).
+
+    Em vez de 'arquivo', o experimento pode trazer os dados já carregados nas chaves
+    'tempo', 'Produto 1' e 'Produto 2'.
+    """
+    tempos, y0s, obs = [], [], []
+    for experimento in experimentos:
+        if "arquivo" in experimento:
+            time, substrate_1, substrate_2, produto_1, produto_2 = read_data_from_excel(
+                experimento["arquivo"], experimento["s0_a"], experimento["s0_b"])
+        else:
+            time, produto_1, produto_2 = experimento["tempo"], experimento["Produto 1"], experimento["Produto 2"]
+            substrate_1, substrate_2 = experimento["s0_a"], experimento["s0_b"]
+        tempos.append(np.asarray(time, dtype=float))
+        y0s.append(condicoes_iniciais(experimento["E0"], substrate_1, substrate_2, produto_1, produto_2))
+        obs.append((substrate_1, substrate_2, produto_1, produto_2))
+
+    if len({t[0] for t in tempos}) > 1:
+        raise ValueError("Todos os experimentos do ajuste global devem começar no mesmo tempo.")
+
+    # Cada experimento lê sua trajetória nas posições dos seus tempos na grade comum
+    t_comum = np.unique(np.concatenate(tempos))
+    indices = [np.searchsorted(t_comum, t) for t in tempos]
+
+    return {"t": t_comum, "indices": indices, "tempos": tempos,
+            "y0": np.array(y0s, dtype=float).T, "obs": obs, "E0": [e["E0"] for e in experimentos]}
+
+## Função objetivo global
+# Um ObjetivoCompilado por experimento (espécies, pesos e perda de cada um); cada avaliação
+# integra todos os experimentos de uma vez na grade comum e soma os erros.
+# Fica no nível do módulo para poder ser enviada ao pool do DE.
+class ObjetivoGlobal:
+    """Soma dos objetivos dos experimentos; residuos/jacobiano empilhados servem ao least_squares."""
+
+    def __init__(self, dados, adjustments, solver=None, perda=None):
+        self.dados = dados
+        self.solver = solver
+        self.compilados = [ObjetivoCompilado(t, y0, *obs, adjustments, solver, perda)
+                           for t, y0, obs in zip(dados["tempos"], dados["y0"].T, dados["obs"])]
+        self.perda_ls = self.compilados[0].perda_ls
+        self.delta = self.compilados[0].delta
+
+        # Com as mesmas espécies em todos os experimentos, alvos e pesos vão para a grade comum
+        # (N, espécie, T), com peso zero onde o experimento não tem medida: o erro de todos sai
+        # de uma única operação vetorial em vez de um laço por experimento
+        self.grade = None
+        indices = self.compilados[0].indices
+        if all(np.array_equal(c.indices, indices) for c in self.compilados):
+            forma = (len(self.compilados), len(indices), len(dados["t"]))
+            self.grade = copy.copy(self.compilados[0])
+            self.grade.alvo, self.grade.raiz = np.zeros(forma), np.zeros(forma)
+            self.grade.piso = np.array([c.piso for c in self.compilados])
+            for n, (c, idx) in enumerate(zip(self.compilados, dados["indices"])):
+                self.grade.alvo[n][:, idx] = c.alvo
+                self.grade.raiz[n][:, idx] = c.raiz
+
+    def erros(self, params):
+        """Erro de cada experimento para um conjunto de constantes."""
+        N = len(self.compilados)
+        y = simular_lote(self.dados["t"], np.tile(params, (N, 1)), self.dados["y0"], self.solver)  # (8, N, T)
+        if self.grade is not None:
+            g = self.grade
+            return g._erro(g._residuos(y[g.indices].transpose(1, 0, 2)), (1, 2))
+        return np.array([c.erro_trajetoria(y[:, n, idx])
+                         for n, (c, idx) in enumerate(zip(self.compilados, self.dados["indices"]))])
+
+    def __call__(self, params):
+        return float(np.sum(self.erros(params)))
+
+    def residuos(self, params):
+        return np.concatenate([c.residuos(params) for c in self.compilados])
+
+    def jacobiano(self, params):
+        return np.vstack([c.jacobiano(params) for c in self.compilados])
+
+#Custo de uma avaliação global comparado a uma integração isolada
+def medir_custo(params, dados, adjustments, solver=None, repeticoes=20):
+    N = len(dados["indices"])
+    objetivo = ObjetivoGlobal(dados, adjustments, solver)
+    objetivo(params)  # Aquecimento
+
+    inicio = _time.perf_counter()
+    for _ in range(repeticoes):
+        objetivo(params)
+    ms_global = 1000 * (_time.perf_counter() - inicio) / repeticoes
+
+    # Média de uma integração isolada de cada experimento
+    inicio = _time.perf_counter()
+    for _ in range(repeticoes):
+        for t, y0 in zip(dados["tempos"], dados["y0"].T):
+            kinetic_model(t, params, y0, solver)
+    ms_unica = 1000 * (_time.perf_counter() - inicio) / (repeticoes * N)
+
+    return {"experimentos": N, "ms_por_avaliacao": ms_global, "ms_por_experimento": ms_global / N,
+            "ms_solucao_unica": ms_unica, "razao_solucao_unica": ms_global / (N * ms_unica)}
+
+## Ajuste global
+def ajustar_global(experimentos, adjustments, maxiter, popsize, mutation, recombination,
+                   workers=1, seed=None, solver=None, refinamento=None, medir=False, espaco=None, perda=None):
+    """Ajusta um único vetor (k1, k_1, k2, k3, k_3, k4) a todos os experimentos.
+
+    Mesmas opções de calculate_kinetics; refinamento ativa o ajuste em duas etapas.
+    espaco, perda: escala, limites e ordem dos Km (EspacoParametros) e função objetivo (PERDA_PADRAO),
+    como no ajuste de um experimento. Não há semeadura QSSA: a estimativa é por experimento.
+    medir: mede o custo de uma avaliação global (medir_custo) depois do ajuste; são mais
+    repeticoes avaliações globais e integrações isoladas, por isso fica desligado por padrão.
+    """
+    dados = preparar_dados(experimentos)
+    objetivo = ObjetivoGlobal(dados, adjustments, solver, perda)  # Erro se nenhuma espécie foi escolhida
+
+    espaco = EspacoParametros() if espaco is None else espaco
+    limites = espaco.limites_otimizador(espaco.limites_padrao())  # Limites no espaço do otimizador
+    funcao, args = objetivo, ()
+    if not espaco.identidade:
+        funcao, args = objetivo_espaco, (espaco, objetivo)
+    updating = 'immediate' if workers == 1 else 'deferred'
+
+    opcoes_de = {"maxiter": maxiter, "popsize": popsize, "mutation": mutation, "recombination": recombination,
+                 "seed": seed, "workers": workers, "updating": updating, "constraints": espaco.restricao()}
+    if refinamento is not None:
+        refinamento = {**REFINAMENTO_PADRAO, **refinamento}
+        opcoes_de.update(maxiter=min(maxiter, refinamento["maxiter_global"]), tol=refinamento["tol"],
+                         atol=refinamento["atol"], polish=False)
+    result = differential_evolution(funcao, limites, args=args, **opcoes_de)
+    if refinamento is not None:
+        # Mesmo refinamento do ajuste de um experimento, com os resíduos de todos empilhados
+        result = aplicar_refinamento(result, {"espaco": espaco, "limites": limites, "compilado": objetivo},
+                                     refinamento)
+    result.x = espaco.para_constantes(result.x)
+
+    # Um FitResult por experimento, todos com as mesmas constantes
+    k1, k_1, k2, k3, k_3, k4 = result.x
+    Km_A = (k_1 + k2) / k1 # Cálculo de Km para substrato A
+    Km_B = (k_3 + k4) / k3 # Cálculo de Km para substrato B
+    erros = objetivo.erros(result.x)
+    resultados = []
+    for n, (t, y0) in enumerate(zip(dados["tempos"], dados["y0"].T)):
+        sol = kinetic_model(t, result.x, y0, solver)
+        Vmax = dados["E0"][n] * min(k2, k4)
+        resultados.append(FitResult(k1, k_1, k2, k3, k_3, k4, Km_A, Km_B, Vmax, t, sol,
+                                    erros[n], result.nfev, result.nit))
+
+    custo = medir_custo(result.x, dados, adjustments, solver) if medir else None
+    return GlobalFitResult(tuple(result.x), resultados, result.fun, result.nfev, result.nit, custo)
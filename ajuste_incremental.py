@@ -0,0 +1,164 @@
+## Ajuste incremental para acompanhar um reator em operação
+# As amostras novas de Produto 1/Produto 2 chegam aos poucos. Em vez de refazer o ajuste
+# global, cada atualização:
+#   1. integra eq_dif (com as sensibilidades dy/dk) só na janela nova, a partir do último
+#      estado guardado;
+#   2. corrige as constantes com um passo de filtro de Kalman estendido sobre os parâmetros,
+#      usando as sensibilidades como matriz de observação.
+# refinar() roda alguns passos de mínimos quadrados em todo o histórico quando necessário,
+# com o motor de mínimos quadrados (mesmos espaco, limites e perda de um ajuste comum).
+#
+# Uso:
+#   resultado = funcao_final(...)                      # ajuste inicial com os dados já medidos
+#   monitor = AjusteIncremental.de_resultado(resultado, E0, s0_a, s0_b)
+#   monitor.adicionar([65, 70], [0.41, 0.43], [0.22, 0.24])
+#   monitor.constantes, monitor.incerteza
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from funcoes_modelagem_final import SOLVER_PADRAO, condicoes_iniciais, eq_dif_sensibilidade, simular_sensibilidades
+from espaco_parametros import EspacoParametros
+from motores_ajuste import MotorMinimosQuadrados, ProblemaAjuste
+
+# Posição de Produto 1 e Produto 2 no vetor de estado
+ESPECIES_MEDIDAS = (6, 7)
+
+
+class AjusteIncremental:
+    """Estimativa das constantes atualizada a cada bloco de amostras novas.
+
+    k_inicial: constantes de partida (por exemplo, de um ajuste anterior).
+    incerteza_relativa: desvio padrão inicial de cada constante, relativo ao seu valor.
+    ruido: desvio padrão das medidas de concentração.
+    deriva: variância acrescentada às constantes por unidade de tempo (atividade da enzima
+    que muda durante a operação); 0 considera as constantes fixas.
+    espaco, perda: limites e escala (EspacoParametros) e função objetivo do refinar(), como no
+    ajuste comum; a correção do filtro fica dentro dos limites do espaco. bounds: um único
+    (mínimo, máximo) para todas as constantes, usado só sem espaco.
+    """
+
+    def __init__(self, E0, s0_a, s0_b, k_inicial, t0=0.0, produto_1_0=0.0, produto_2_0=0.0,
+                 incerteza_relativa=0.5, ruido=0.01, deriva=0.0, bounds=None, solver=None, espaco=None,
+                 perda=None):
+        self.E0, self.s0_a, self.s0_b = E0, s0_a, s0_b
+        self.k = np.array(k_inicial, dtype=float)
+        self.P = np.diag((incerteza_relativa * self.k) ** 2)
+        self.ruido = ruido
+        self.deriva = deriva
+        if espaco is None:
+            espaco = EspacoParametros(bounds=None if bounds is None else [bounds] * 6)
+        self.espaco = espaco
+        self.perda = perda
+        self.lo, self.hi = np.array(espaco.limites_padrao(), dtype=float).T
+        self.solver = SOLVER_PADRAO if solver is None else {**SOLVER_PADRAO, **solver}
+
+        # Histórico das medidas (o primeiro ponto define as condições iniciais)
+        self.tempos = [float(t0)]
+        self.medidas = [[produto_1_0, produto_2_0]]
+        self.y0 = np.array(condicoes_iniciais(E0, s0_a, s0_b, [produto_1_0], [produto_2_0]), dtype=float)
+        self.historico = [(float(t0), self.k.copy())]
+
+        # Último estado e sensibilidades, válidos para as constantes atuais
+        self.z = np.concatenate([self.y0, np.zeros(48)])
+        self.nfev = 0
+
+    @classmethod
+    def de_resultado(cls, resultado, E0, s0_a, s0_b, **opcoes):
+        """Parte de um FitResult e incorpora as medidas usadas no ajuste."""
+        time = np.asarray(resultado.time, dtype=float)
+        p1 = np.asarray(resultado.experimental["Produto 1"], dtype=float)
+        p2 = np.asarray(resultado.experimental["Produto 2"], dtype=float)
+        monitor = cls(E0, s0_a, s0_b, resultado.constantes, time[0], np.nan_to_num(p1[0]), np.nan_to_num(p2[0]),
+                      **opcoes)
+        monitor.tempos = list(time)
+        monitor.medidas = [list(m) for m in zip(p1, p2)]
+        monitor._reiniciar_estado()
+        return monitor
+
+    @property
+    def constantes(self):
+        return tuple(self.k)
+
+    @property
+    def incerteza(self):
+        """Desvio padrão estimado de cada constante."""
+        return np.sqrt(np.diag(self.P))
+
+    @property
+    def t(self):
+        return self.tempos[-1]
+
+    #Integra estado e sensibilidades de t até os tempos novos, a partir do estado guardado
+    def _integrar_janela(self, tempos):
+        sol = solve_ivp(eq_dif_sensibilidade, [self.t, tempos[-1]], self.z, method="LSODA", t_eval=tempos,
+                        args=tuple(self.k), rtol=self.solver["rtol"], atol=self.solver["atol"])
+        self.nfev += sol.nfev
+        if not sol.success:
+            raise RuntimeError(f"Falha na integração da janela [{self.t}, {tempos[-1]}]: {sol.message}")
+        return sol.y
+
+    #Recalcula o estado final integrando todo o histórico com as constantes atuais
+    def _reiniciar_estado(self):
+        y, S = simular_sensibilidades(np.array(self.tempos), self.k, self.y0, self.solver)
+        self.z = np.concatenate([y[:, -1], S[:, :, -1].ravel()])
+
+    def adicionar(self, tempos, produto_1, produto_2):
+        """Incorpora amostras novas (tempos posteriores ao último) e devolve as constantes atualizadas.
+
+        Medidas faltando (NaN) são ignoradas na correção.
+        """
+        tempos = np.atleast_1d(np.asarray(tempos, dtype=float))
+        medidas = np.column_stack([np.atleast_1d(produto_1), np.atleast_1d(produto_2)]).astype(float)
+        if tempos[0] <= self.t or np.any(np.diff(tempos) <= 0):
+            raise ValueError("Os tempos novos devem ser crescentes e posteriores à última amostra.")
+
+        z = self._integrar_janela(tempos)  # (56, T)
+        y, S = z[:8], z[8:].reshape(8, 6, -1)
+
+        # Observações: Produto 1 e 2 em cada tempo novo; H = dy/dk nesses pontos
+        h = y[list(ESPECIES_MEDIDAS)].T.ravel()
+        H = S[list(ESPECIES_MEDIDAS)].transpose(2, 0, 1).reshape(-1, 6)
+        medido = ~np.isnan(medidas.ravel())
+        inovacao = (medidas.ravel() - h)[medido]
+        H = H[medido]
+
+        # Predição: as constantes podem derivar lentamente entre as amostras
+        self.P = self.P + self.deriva * (tempos[-1] - self.t) * np.eye(6)
+
+        # Correção do filtro de Kalman estendido
+        if inovacao.size:
+            Sinov = H @ self.P @ H.T + self.ruido ** 2 * np.eye(inovacao.size)
+            ganho = np.linalg.solve(Sinov, H @ self.P).T
+            dk = np.clip(self.k + ganho @ inovacao, self.lo, self.hi) - self.k
+            self.k = self.k + dk
+            self.P = (np.eye(6) - ganho @ H) @ self.P
+            self.P = (self.P + self.P.T) / 2
+        else:
+            dk = np.zeros(6)
+
+        # Estado final corrigido em primeira ordem para as constantes novas
+        y_final, S_final = z[:8, -1], z[8:, -1].reshape(8, 6)
+        self.z = np.concatenate([y_final + S_final @ dk, S_final.ravel()])
+
+        self.tempos.extend(tempos)
+        self.medidas.extend(medidas.tolist())
+        self.historico.append((float(tempos[-1]), self.k.copy()))
+        return self.constantes
+
+    def refinar(self, passos=5, adjustments=None):
+        """Alguns passos de mínimos quadrados (TRF) em todo o histórico, partindo da estimativa atual."""
+        adjustments = adjustments or {"P1_adjust": True, "P2_adjust": True}
+        medidas = np.array(self.medidas)
+        problema = ProblemaAjuste(np.array(self.tempos), self.E0, self.s0_a, self.s0_b, medidas[:, 0],
+                                  medidas[:, 1], adjustments, self.solver, espaco=self.espaco, perda=self.perda)
+        resultado = MotorMinimosQuadrados(self.k, refinamento={"max_nfev": passos}).ajustar(problema)
+        self.k = np.array(resultado.constantes, dtype=float)
+        self.nfev += resultado.nfev
+        self._reiniciar_estado()
+        self.historico.append((self.t, self.k.copy()))
+        return self.constantes
+
+    def previsao(self, tempos):
+        """Trajetória prevista (8, T) a partir do último estado, com as constantes atuais."""
+        tempos = np.atleast_1d(np.asarray(tempos, dtype=float))
+        return self._integrar_janela(tempos)[:8]
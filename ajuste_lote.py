@@ -0,0 +1,200 @@
+## Ajuste em lote de vários experimentos (arquivos Excel, CSV ou Parquet)
+# Uso pela linha de comando:
+#   python ajuste_lote.py pasta_com_dados --E0 0.1 --s0_a 1.0 --s0_b 1.5 --saida resumo.csv
+#   python ajuste_lote.py manifesto.csv --saida resumo.parquet --processos 8
+#   python ajuste_lote.py manifesto.csv --global   (constantes compartilhadas, ver ajuste_global.py)
+# O manifesto é um CSV com as colunas arquivo, E0, s0_a, s0_b (caminhos relativos ao manifesto)
+# e, opcionalmente, lote (lote da enzima, gravado junto com o ajuste quando há --banco)
+import argparse
+import csv
+import os
+import time as _time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from modelagem import funcao_final
+
+# Colunas do arquivo de resumo, na ordem em que são escritas
+COLUNAS_RESUMO = ["arquivo", "E0", "s0_a", "s0_b", "k1", "k_1", "k2", "k3", "k_3", "k4",
+                  "Km_A", "Km_B", "Vmax", "objetivo", "nfev", "nit", "segundos", "erro"]
+
+# Configuração padrão do ajuste de cada experimento
+OPCOES_PADRAO = {
+    "adjustments": {"P1_adjust": True, "P2_adjust": True},
+    "maxiter": 1000, "popsize": 15, "mutation": (0.5, 1), "recombination": 0.7,
+    "seed": None, "solver": None, "refinamento": None, "qssa": False, "espaco": None,
+    "perda": None, "banco": None, "multiplo": None, "motor": None,
+}
+
+#Lista os experimentos de um manifesto CSV
+def ler_manifesto(caminho):
+    """Cada linha do manifesto vira um experimento {arquivo, E0, s0_a, s0_b}."""
+    import pandas as pd
+
+    base = os.path.dirname(os.path.abspath(caminho))
+    manifesto = pd.read_csv(caminho)
+    experimentos = []
+    for linha in manifesto.to_dict("records"):
+        arquivo = linha["arquivo"]
+        if not os.path.isabs(arquivo):
+            arquivo = os.path.join(base, arquivo)
+        experimento = {"arquivo": arquivo, "E0": float(linha["E0"]),
+                       "s0_a": float(linha["s0_a"]), "s0_b": float(linha["s0_b"])}
+        if pd.notna(linha.get("lote")):
+            experimento["lote"] = str(linha["lote"])
+        experimentos.append(experimento)
+    return experimentos
+
+#Lista os arquivos de dados de uma pasta, todos com as mesmas condições iniciais
+def listar_diretorio(diretorio, E0, s0_a, s0_b):
+    arquivos = sorted(f for f in os.listdir(diretorio) if f.lower().endswith((".xlsx", ".xls", ".csv", ".parquet")))
+    return [{"arquivo": os.path.join(diretorio, f), "E0": E0, "s0_a": s0_a, "s0_b": s0_b} for f in arquivos]
+
+#Linha do resumo a partir de um FitResult
+def linha_resumo(experimento, resultado, segundos):
+    linha = dict(experimento)
+    linha.update(zip(["k1", "k_1", "k2", "k3", "k_3", "k4"], map(float, resultado.constantes)))
+    linha.update(Km_A=float(resultado.Km_A), Km_B=float(resultado.Km_B), Vmax=float(resultado.Vmax),
+                 objetivo=float(resultado.objetivo), nfev=int(resultado.nfev), nit=int(resultado.nit),
+                 segundos=segundos, erro="")
+    return {coluna: linha.get(coluna) for coluna in COLUNAS_RESUMO}
+
+#Ajusta um único experimento; roda dentro de um processo do pool
+def ajustar_experimento(experimento, opcoes):
+    inicio = _time.perf_counter()
+    try:
+        resultado = funcao_final(experimento["arquivo"], experimento["E0"], experimento["s0_a"], experimento["s0_b"],
+                                 opcoes["adjustments"], opcoes["maxiter"], opcoes["popsize"],
+                                 opcoes["mutation"], opcoes["recombination"], seed=opcoes["seed"],
+                                 solver=opcoes["solver"], refinamento=opcoes["refinamento"], plot=False,
+                                 qssa=opcoes["qssa"], espaco=opcoes["espaco"], perda=opcoes["perda"],
+                                 banco=opcoes["banco"], metadados={"lote": experimento.get("lote")},
+                                 multiplo=opcoes["multiplo"], motor=opcoes["motor"])
+    except Exception as e:
+        # Um arquivo com problema não interrompe o lote: o erro fica registrado no resumo
+        linha = dict(experimento, segundos=_time.perf_counter() - inicio, erro=f"{type(e).__name__}: {e}")
+        return {coluna: linha.get(coluna) for coluna in COLUNAS_RESUMO}
+    return linha_resumo(experimento, resultado, _time.perf_counter() - inicio)
+
+class EscritorResumo:
+    """Grava cada resultado no resumo assim que ele fica pronto (CSV ou Parquet)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.parquet = caminho.lower().endswith(".parquet")
+        self._arquivo = None
+        self._escritor = None
+
+    def escrever(self, linha):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            tabela = pa.Table.from_pylist([linha], schema=self._esquema_parquet())
+            if self._escritor is None:
+                self._escritor = pq.ParquetWriter(self.caminho, tabela.schema)
+            self._escritor.write_table(tabela)
+        else:
+            if self._escritor is None:
+                self._arquivo = open(self.caminho, "w", newline="", encoding="utf-8")
+                self._escritor = csv.DictWriter(self._arquivo, fieldnames=COLUNAS_RESUMO)
+                self._escritor.writeheader()
+            self._escritor.writerow(linha)
+            self._arquivo.flush()
+
+    def _esquema_parquet(self):
+        import pyarrow as pa
+        tipos = {"arquivo": pa.string(), "erro": pa.string(), "nfev": pa.int64(), "nit": pa.int64()}
+        return pa.schema([(coluna, tipos.get(coluna, pa.float64())) for coluna in COLUNAS_RESUMO])
+
+    def fechar(self):
+        if self._escritor is not None and self.parquet:
+            self._escritor.close()
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+## Ajuste em lote (API Python)
+def ajustar_lote(experimentos, saida=None, processos=None, **opcoes):
+    """Ajusta os experimentos em paralelo e grava o resumo à medida que cada um termina.
+
+    experimentos: lista de dicionários {arquivo, E0, s0_a, s0_b} (ver ler_manifesto).
+    saida: caminho .csv ou .parquet do resumo (opcional).
+    processos: tamanho do pool (None usa todos os núcleos).
+    opcoes: sobrescrevem OPCOES_PADRAO (adjustments, maxiter, popsize, ...).
+    Retorna a lista de linhas do resumo na ordem em que os ajustes terminaram.
+    """
+    opcoes = {**OPCOES_PADRAO, **opcoes}
+    escritor = EscritorResumo(saida) if saida else None
+    linhas = []
+    try:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            futuros = [pool.submit(ajustar_experimento, experimento, opcoes) for experimento in experimentos]
+            for futuro in as_completed(futuros):
+                linha = futuro.result()
+                linhas.append(linha)
+                if escritor is not None:
+                    escritor.escrever(linha)
+    finally:
+        if escritor is not None:
+            escritor.fechar()
+    return linhas
+
+#Ajuste global (constantes compartilhadas); uma linha do resumo por experimento
+def ajustar_lote_global(experimentos, saida=None, workers=1, **opcoes):
+    from ajuste_global import ajustar_global
+    opcoes = {**OPCOES_PADRAO, **opcoes}
+    inicio = _time.perf_counter()
+    resultado = ajustar_global(experimentos, opcoes["adjustments"], opcoes["maxiter"], opcoes["popsize"],
+                               opcoes["mutation"], opcoes["recombination"], workers=workers, seed=opcoes["seed"],
+                               solver=opcoes["solver"], refinamento=opcoes["refinamento"],
+                               espaco=opcoes["espaco"], perda=opcoes["perda"])
+    segundos = _time.perf_counter() - inicio
+    linhas = [linha_resumo(e, r, segundos) for e, r in zip(experimentos, resultado.resultados)]
+    if saida:
+        escritor = EscritorResumo(saida)
+        try:
+            for linha in linhas:
+                escritor.escrever(linha)
+        finally:
+            escritor.fechar()
+    print(resultado.resumo())
+    return linhas
+
+#Linha de comando
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ajuste em lote do modelo ping-pong bi-bi.")
+    parser.add_argument("entrada", help="pasta com arquivos Excel ou manifesto CSV (arquivo, E0, s0_a, s0_b)")
+    parser.add_argument("--saida", default="resumo_ajustes.csv", help="arquivo de resumo (.csv ou .parquet)")
+    parser.add_argument("--E0", type=float, help="E0 usado para todos os arquivos de uma pasta")
+    parser.add_argument("--s0_a", type=float, help="s0_a usado para todos os arquivos de uma pasta")
+    parser.add_argument("--s0_b", type=float, help="s0_b usado para todos os arquivos de uma pasta")
+    parser.add_argument("--processos", type=int, default=None, help="número de processos (padrão: todos os núcleos)")
+    parser.add_argument("--maxiter", type=int, default=OPCOES_PADRAO["maxiter"])
+    parser.add_argument("--popsize", type=int, default=OPCOES_PADRAO["popsize"])
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--refinamento", action="store_true", help="ajuste em duas etapas (DE curto + mínimos quadrados)")
+    parser.add_argument("--banco", default=None,
+                        help="banco SQLite de resultados: ajustes já feitos são reaproveitados e os novos guardados")
+    parser.add_argument("--global", dest="global_", action="store_true",
+                        help="ajusta um único conjunto de constantes a todos os experimentos")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.entrada):
+        if None in (args.E0, args.s0_a, args.s0_b):
+            parser.error("para uma pasta é preciso informar --E0, --s0_a e --s0_b")
+        experimentos = listar_diretorio(args.entrada, args.E0, args.s0_a, args.s0_b)
+    else:
+        experimentos = ler_manifesto(args.entrada)
+
+    opcoes = {"maxiter": args.maxiter, "popsize": args.popsize, "seed": args.seed,
+              "refinamento": {} if args.refinamento else None, "banco": args.banco}
+    inicio = _time.perf_counter()
+    if args.global_:
+        # No ajuste global o pool avalia a população do DE
+        linhas = ajustar_lote_global(experimentos, args.saida, workers=args.processos or -1, **opcoes)
+    else:
+        linhas = ajustar_lote(experimentos, args.saida, args.processos, **opcoes)
+    falhas = sum(1 for linha in linhas if linha["erro"])
+    print(f"{len(linhas)} experimentos ajustados em {_time.perf_counter() - inicio:.1f} s "
+          f"({falhas} com erro) -> {args.saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+## Ajuste com vários inícios, reinícios e eliminação antecipada das buscas atrasadas
+# Várias buscas do differential_evolution, cada uma com sua semente, avançam em etapas de
+# `intervalo` gerações (em paralelo quando há processos). Em cada ponto de controle é eliminada
+# a busca que está atrás da líder e quase não melhorou na última etapa: nesse modelo as buscas
+# que lideram nas primeiras gerações são justamente as que convergem cedo para um mínimo local,
+# então estar atrás sozinho não basta (buscas lentas ainda melhorando continuam). As gerações
+# que a eliminada usaria ficam para as buscas que continuam; só uma busca que convergiu dá lugar
+# a uma busca nova (semente nova), e apenas enquanto sobra orçamento. O ajuste termina quando
+# `confirmacoes` buscas convergiram para o mesmo melhor valor (dentro de atraso) ou quando o
+# orçamento de gerações (por padrão o maxiter de uma busca única) acaba; a líder é então refinada
+# por mínimos quadrados (no lugar do polimento do DE).
+# Cada etapa recomeça o DE com a população e o gerador aleatório da etapa anterior.
+#
+# Uso:
+#   resultado = funcao_final(..., multiplo={"inicios": 4})
+#   print(resultado.inicios.resumo())   # histórico e destino de cada busca
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import OptimizeResult, differential_evolution
+
+from funcoes_modelagem_final import (
+    REFINAMENTO_PADRAO, condicoes_iniciais, preparar_busca, aplicar_refinamento, montar_resultado,
+)
+from qssa_modelagem import estimar_qssa, populacao_qssa
+
+# inicios: buscas simultâneas; intervalo: gerações entre pontos de controle
+# atraso: busca com objetivo acima de (1 + atraso) vezes o da líder está atrasada
+# melhora_minima: melhora relativa na última etapa abaixo da qual a busca atrasada é eliminada
+# confirmacoes: buscas convergidas no melhor valor necessárias para encerrar antes do orçamento
+# orcamento: gerações somadas de todas as buscas (None usa o maxiter do ajuste)
+MULTIPLO_PADRAO = {"inicios": 2, "intervalo": 10, "atraso": 0.1, "melhora_minima": 1e-3, "confirmacoes": 2,
+                   "orcamento": None}
+
+
+class Execucao:
+    """Estado e histórico de uma das buscas."""
+
+    def __init__(self, indice, gerador, populacao=None):
+        self.indice = indice
+        self.gerador = gerador        # np.random.Generator próprio, continua de uma etapa para a outra
+        self.populacao = populacao    # None: a primeira etapa sorteia a população (latinhypercube)
+        self.historico = []           # Melhor objetivo a cada geração
+        self.x = None                 # Melhor ponto (espaço do otimizador)
+        self.melhor = np.inf
+        self.anterior = np.inf
+        self.nfev = 0
+        self.geracoes = 0
+        self.estado = "ativa"         # ativa, convergiu, eliminada, ou (ao final) orçamento/encerrada/interrompida
+        self.eliminada_em = None      # Gerações consumidas pelo agendador quando foi eliminada
+
+    def atualizar(self, etapa):
+        self.anterior = self.melhor  # Melhor objetivo antes da etapa
+        self.populacao, self.gerador, self.x, self.melhor, nfev, historico, convergiu = etapa
+        self.nfev += nfev
+        self.geracoes += len(historico)
+        self.historico.extend(historico)
+        if convergiu:
+            self.estado = "convergiu"
+
+
+class RelatorioInicios:
+    """Todas as buscas de um ajuste com vários inícios."""
+
+    def __init__(self, execucoes, lider, orcamento, geracoes):
+        self.execucoes = execucoes  # Lista de Execucao
+        self.lider = lider          # Índice da busca que deu o resultado
+        self.orcamento = orcamento  # Gerações disponíveis
+        self.geracoes = geracoes    # Gerações usadas
+
+    def resumo(self):
+        linhas = [f"Buscas: {len(self.execucoes)} (líder: busca {self.lider}, "
+                  f"{self.geracoes} de {self.orcamento} gerações)"]
+        for e in self.execucoes:
+            estado = e.estado if e.eliminada_em is None else f"eliminada ({e.eliminada_em} gerações)"
+            linhas.append(f"busca {e.indice}: {e.melhor:.4g} | {e.geracoes} gerações | "
+                          f"{e.nfev} avaliações | {estado}")
+        return "\n".join(linhas)
+
+#Uma etapa de uma busca (nível de módulo para ir ao pool)
+def _avancar(busca_de, geracoes, opcoes, populacao, gerador):
+    funcao, limites, args = busca_de
+    historico = []
+
+    def registrar(intermediate_result):
+        historico.append(float(intermediate_result.fun))
+
+    result = differential_evolution(funcao, limites, args=args, maxiter=geracoes, seed=gerador,
+                                    init="latinhypercube" if populacao is None else populacao,
+                                    polish=False, callback=registrar, **opcoes)
+    # success antes do maxiter = critério de convergência (tol/atol) do próprio DE
+    return (result.population, gerador, result.x, float(result.fun), int(result.nfev), historico,
+            bool(result.success))
+
+def ajustar_multiplos(time, E0, substrate_1, substrate_2, produto_1, produto_2, adjustments,
+                      maxiter, popsize, mutation, recombination, multiplo=None, processos=1, seed=None,
+                      solver=None, vectorized=False, refinamento=None, callback=None, qssa=False,
+                      espaco=None, perda=None):
+    """Ajuste com várias buscas globais (ver MULTIPLO_PADRAO); mesmas opções de ajustar_parametros.
+
+    processos: buscas avançando ao mesmo tempo (-1 usa todos os núcleos).
+    callback: chamado em cada ponto de controle com a melhor busca (x, fun, nit = gerações
+    consumidas, nfev); retornar True interrompe o ajuste.
+    O FitResult devolvido traz o histórico da líder e, em inicios, o RelatorioInicios.
+    """
+    multiplo = {**MULTIPLO_PADRAO, **(multiplo or {})}
+    orcamento = multiplo["orcamento"] or maxiter
+    y0 = condicoes_iniciais(E0, substrate_1, substrate_2, produto_1, produto_2)
+    estimativa = estimar_qssa(time, E0, substrate_1, substrate_2, produto_1, produto_2) if qssa else None
+    busca = preparar_busca(time, y0, substrate_1, substrate_2, produto_1, produto_2, adjustments, popsize,
+                           seed, solver, estimativa, espaco, perda)
+    espaco = busca["espaco"]
+    lo, hi = np.array(busca["limites"]).T
+
+    # Sementes independentes derivadas da seed do ajuste (reprodutível), inclusive as dos reinícios
+    sementes = np.random.SeedSequence(seed)
+
+    def nova_busca(indice):
+        gerador = np.random.default_rng(sementes.spawn(1)[0])
+        populacao = None
+        if estimativa is not None:
+            # Cada busca parte de uma amostra diferente das constantes compatíveis com a estimativa
+            amostra = populacao_qssa(estimativa, max(5, popsize * 6), busca["bounds"], gerador)
+            populacao = np.clip(espaco.para_otimizador(amostra), lo, hi)
+        return Execucao(indice, gerador, populacao)
+
+    execucoes = [nova_busca(i) for i in range(multiplo["inicios"])]
+
+    opcoes = {"popsize": popsize, "mutation": mutation, "recombination": recombination,
+              "vectorized": vectorized, "updating": "deferred" if vectorized else "immediate",
+              "constraints": espaco.restricao()}
+    if refinamento is not None:
+        refinamento = {**REFINAMENTO_PADRAO, **refinamento}
+        opcoes.update(tol=refinamento["tol"], atol=refinamento["atol"])
+    busca_de = (busca["funcao"], busca["limites"], busca["args"])
+
+    processos = os.cpu_count() if processos == -1 else processos
+    pool = ProcessPoolExecutor(max_workers=processos) if processos and processos > 1 else None
+    mapa = pool.map if pool is not None else map
+    gasto = 0
+    fim = "orçamento"  # Estado final das buscas que ainda estiverem ativas
+    try:
+        while gasto < orcamento:
+            ativas = [e for e in execucoes if e.estado == "ativa"]
+            # O orçamento que sobra é dividido entre as buscas ainda ativas
+            passo = min(multiplo["intervalo"], (orcamento - gasto) // max(len(ativas), 1))
+            if not ativas or passo < 1:
+                break
+            etapa = functools.partial(_avancar, busca_de, passo, opcoes)
+            for e, resultado in zip(ativas, mapa(etapa, [e.populacao for e in ativas], [e.gerador for e in ativas])):
+                gasto += len(resultado[5])
+                e.atualizar(resultado)
+
+            # Ponto de controle: elimina as buscas atrasadas em relação à líder e estagnadas
+            lider = min(execucoes, key=lambda e: e.melhor)
+            for e in ativas:
+                atrasada = e.melhor > (1 + multiplo["atraso"]) * lider.melhor
+                estagnada = e.melhor >= (1 - multiplo["melhora_minima"]) * e.anterior
+                if e.estado == "ativa" and atrasada and estagnada:
+                    e.estado, e.eliminada_em = "eliminada", gasto
+
+            parcial = OptimizeResult(x=espaco.para_constantes(lider.x), fun=lider.melhor, nit=gasto,
+                                     nfev=sum(e.nfev for e in execucoes))
+            if callback is not None and callback(parcial):
+                fim = "interrompida"
+                break
+
+            # Melhor valor confirmado por buscas independentes: não há por que continuar
+            confirmadas = [e for e in execucoes if e.estado == "convergiu"
+                           and e.melhor <= (1 + multiplo["atraso"]) * lider.melhor]
+            if len(confirmadas) >= multiplo["confirmacoes"]:
+                fim = "encerrada"
+                break
+
+            # Reinício: cada busca que convergiu abre lugar para uma nova enquanto houver orçamento
+            # (as gerações das eliminadas ficam para as que continuam)
+            for e in ativas:
+                if e.estado == "convergiu" and gasto < orcamento:
+                    execucoes.append(nova_busca(len(execucoes)))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    for e in execucoes:
+        if e.estado == "ativa":
+            e.estado = fim
+    lider = min(execucoes, key=lambda e: e.melhor)
+    result = OptimizeResult(x=lider.x, fun=lider.melhor, nit=gasto, nfev=sum(e.nfev for e in execucoes),
+                            success=lider.estado == "convergiu")
+    # As etapas rodam sem polimento; a líder é sempre refinada (critérios padrão sem refinamento)
+    result = aplicar_refinamento(result, busca, refinamento or REFINAMENTO_PADRAO)
+    result.x = espaco.para_constantes(result.x)
+
+    resultado = montar_resultado(result, time, E0, y0, produto_1, produto_2, solver)
+    resultado.historico = list(lider.historico)
+    resultado.inicios = RelatorioInicios(execucoes, lider.indice, orcamento, gasto)
+    return resultado
@@ -0,0 +1,117 @@
+## Cache das soluções da EDO e das populações finais do differential_evolution
+# Memória: LRU limitado. Disco (opcional): um arquivo .npz por solução em uma pasta,
+# compartilhado entre execuções e entre os processos do pool
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from integrador_numba import SolucaoCompilada
+
+BITS_CHAVE = 33  # Bits da mantissa mantidos na chave (~10 algarismos significativos)
+
+#Arredonda a mantissa de cada valor (escala-invariante, sem laço em Python)
+def arredondar(valores, bits=BITS_CHAVE):
+    mantissa, expoente = np.frexp(np.asarray(valores, dtype=float).ravel())
+    return np.ldexp(np.round(mantissa * 2.0 ** bits), expoente - bits)
+
+#Hash estável de uma sequência de arrays e valores simples
+def chave_hash(*partes):
+    h = hashlib.sha1()
+    for parte in partes:
+        if isinstance(parte, dict):
+            parte = repr(sorted(parte.items()))
+        if isinstance(parte, str):
+            h.update(parte.encode())
+        else:
+            h.update(np.ascontiguousarray(parte, dtype=float).tobytes())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+class CacheSolucoes:
+    """Cache LRU de soluções de kinetic_model com camada opcional em disco."""
+
+    def __init__(self, max_itens=1024, pasta=None, ativo=True):
+        self.max_itens = max_itens
+        self.pasta = pasta      # None desativa a camada em disco
+        self.ativo = ativo
+        self._memoria = OrderedDict()
+        self._populacoes = {}
+        self.acertos = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+
+    def chave(self, t, k_params, y0, solver):
+        """Chave da solução: parâmetros arredondados, y0, grade de tempo e configuração do integrador."""
+        return chave_hash(arredondar(k_params), arredondar(y0), np.asarray(t, dtype=float), solver)
+
+    def obter(self, chave):
+        if chave in self._memoria:
+            self._memoria.move_to_end(chave)
+            self.acertos += 1
+            return self._memoria[chave]
+        if self.pasta is not None:
+            caminho = os.path.join(self.pasta, chave + ".npz")
+            if os.path.exists(caminho):
+                with np.load(caminho) as arquivo:
+                    sol = SolucaoCompilada(arquivo["t"], arquivo["y"], int(arquivo["nfev"]), 0, True)
+                self._guardar_memoria(chave, sol)
+                self.acertos += 1
+                self.acertos_disco += 1
+                return sol
+        self.falhas += 1
+        return None
+
+    def guardar(self, chave, sol):
+        # Integrações que falharam não são reaproveitadas
+        if not sol.success:
+            return
+        self._guardar_memoria(chave, sol)
+        if self.pasta is not None:
+            os.makedirs(self.pasta, exist_ok=True)
+            caminho = os.path.join(self.pasta, chave + ".npz")
+            temporario = caminho + f".{os.getpid()}.tmp.npz"
+            np.savez(temporario, t=sol.t, y=sol.y, nfev=sol.nfev)
+            os.replace(temporario, caminho)  # Escrita atômica (vários processos podem gravar)
+
+    def _guardar_memoria(self, chave, sol):
+        self._memoria[chave] = sol
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_itens:
+            self._memoria.popitem(last=False)
+
+    ## Populações do differential_evolution para reiniciar ajustes do mesmo conjunto de dados
+    def chave_dados(self, time, y0, produto_1, produto_2, adjustments, bounds, *extras):
+        """extras: textos que também identificam o ajuste (ex.: escala do espaço de parâmetros)."""
+        return chave_hash(np.asarray(time, dtype=float), arredondar(y0), produto_1, produto_2,
+                          adjustments, np.asarray(bounds, dtype=float), *extras)
+
+    def populacao(self, chave):
+        if chave in self._populacoes:
+            return self._populacoes[chave]
+        if self.pasta is not None:
+            caminho = os.path.join(self.pasta, "populacao_" + chave + ".npy")
+            if os.path.exists(caminho):
+                self._populacoes[chave] = np.load(caminho)
+                return self._populacoes[chave]
+        return None
+
+    def guardar_populacao(self, chave, populacao):
+        if populacao is None:
+            return
+        self._populacoes[chave] = np.array(populacao)
+        if self.pasta is not None:
+            os.makedirs(self.pasta, exist_ok=True)
+            np.save(os.path.join(self.pasta, "populacao_" + chave + ".npy"), self._populacoes[chave])
+
+    def estatisticas(self):
+        total = self.acertos + self.falhas
+        return {"acertos": self.acertos, "acertos_disco": self.acertos_disco, "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0, "itens": len(self._memoria)}
+
+    def limpar(self):
+        self._memoria.clear()
+        self._populacoes.clear()
+        self.acertos = self.acertos_disco = self.falhas = 0
@@ -0,0 +1,232 @@
+## Linha de comando e serviço HTTP do ajuste, sem interface gráfica
+# Importa só o núcleo numérico; matplotlib é carregado apenas quando um gráfico é pedido.
+# Uso:
+#   python -m cli_modelagem fit dados.xlsx --E0 0.1 --s0_a 1.0 --s0_b 1.5 [--refinamento] [--qssa] [--log]
+#                          [--motor trf] [--perda huber] [--json resultado.json] [--grafico resultado.png]
+#   python -m cli_modelagem servir --porta 8765 --processos 2
+#   python -m cli_modelagem inicio        (tempo de importação comparado com ORCAMENTO_INICIO)
+#   python -m cli_modelagem consultar --coluna Km_A --por lote   (ajustes guardados no banco)
+#
+# Serviço: POST /fit com {"arquivo", "E0", "s0_a", "s0_b", opções de OPCOES_PADRAO...}
+# devolve a linha de resumo (mesmas colunas de ajuste_lote); GET /saude informa o estado.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time as _time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from ajuste_lote import OPCOES_PADRAO, ajustar_experimento, linha_resumo
+from espaco_parametros import EspacoParametros
+from resultados_modelagem import BancoResultados, BANCO_PADRAO
+
+ORCAMENTO_INICIO = 1.5  # Segundos para importar o núcleo numérico (sem matplotlib/PyQt5)
+MODULOS_PROIBIDOS = ("matplotlib", "PyQt5")  # Não podem ser importados pelo caminho sem gráficos
+
+#Opções do ajuste a partir de um dicionário (argumentos da linha de comando ou JSON do serviço)
+def opcoes_ajuste(dados):
+    opcoes = {**OPCOES_PADRAO}
+    for chave in ("maxiter", "popsize", "seed", "qssa", "banco", "motor"):
+        if dados.get(chave) is not None:
+            opcoes[chave] = dados[chave]
+    if dados.get("refinamento"):
+        opcoes["refinamento"] = dados["refinamento"] if isinstance(dados["refinamento"], dict) else {}
+    if dados.get("escala", "linear") != "linear" or dados.get("ordem_km"):
+        opcoes["espaco"] = EspacoParametros(dados.get("escala", "linear"), ordem_km=dados.get("ordem_km"))
+    if dados.get("inicios"):
+        opcoes["multiplo"] = {"inicios": dados["inicios"]}
+    if dados.get("perda"):
+        # "huber" ou {"tipo": "huber", "delta": 0.05, "pesos": {"P2_adjust": 2}} (ver PERDA_PADRAO)
+        opcoes["perda"] = dados["perda"] if isinstance(dados["perda"], dict) else {"tipo": dados["perda"]}
+    return opcoes
+
+## Ajuste de um arquivo
+def comando_fit(args):
+    from graficos_modelagem import plot_results
+    from modelagem import funcao_final
+
+    opcoes = opcoes_ajuste(vars(args))
+    experimento = {"arquivo": args.arquivo, "E0": args.E0, "s0_a": args.s0_a, "s0_b": args.s0_b}
+    metadados = {"lote": args.lote} if args.lote else None
+    inicio = _time.perf_counter()
+    resultado = funcao_final(args.arquivo, args.E0, args.s0_a, args.s0_b, opcoes["adjustments"], opcoes["maxiter"],
+                             opcoes["popsize"], opcoes["mutation"], opcoes["recombination"], seed=opcoes["seed"],
+                             refinamento=opcoes["refinamento"], plot=False, qssa=opcoes["qssa"],
+                             espaco=opcoes["espaco"], perda=opcoes["perda"], banco=opcoes["banco"],
+                             metadados=metadados, multiplo=opcoes["multiplo"], motor=opcoes["motor"])
+    linha = linha_resumo(experimento, resultado, _time.perf_counter() - inicio)
+    print(resultado.resumo())
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(linha, arquivo, indent=2)
+    if args.grafico:
+        import matplotlib
+        matplotlib.use("Agg")  # Sem janela: a figura vai direto para o arquivo
+        experimental = resultado.experimental
+        plot_results(resultado, experimental["Produto 1"], experimental["Produto 2"], args.s0_b, arquivo=args.grafico)
+    return 0
+
+## Serviço HTTP com pool de processos já aquecido
+#Importa o núcleo e compila o integrador em cada processo antes do primeiro pedido
+def _aquecer():
+    from integrador_numba import integrar_compilado
+    integrar_compilado([0.0, 1.0], (1, 1, 1, 1, 1, 1), [0.1, 1, 0, 0, 1, 0, 0, 0])
+    return True
+
+
+class ServicoAjuste(ThreadingHTTPServer):
+    """Servidor local que repassa cada pedido de ajuste a um processo do pool."""
+
+    daemon_threads = True
+
+    def __init__(self, endereco, processos=None):
+        super().__init__(endereco, ManipuladorAjuste)
+        self.processos = processos or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.processos, initializer=_aquecer)
+        # Um pedido vazio por processo força a criação e o aquecimento de todos
+        for futuro in [self.pool.submit(_aquecer) for _ in range(self.processos)]:
+            futuro.result()
+        self.atendidos = 0
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+
+
+class ManipuladorAjuste(BaseHTTPRequestHandler):
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        if self.path != "/saude":
+            return self._responder(404, {"erro": "rota desconhecida"})
+        self._responder(200, {"processos": self.server.processos, "atendidos": self.server.atendidos})
+
+    def do_POST(self):
+        if self.path != "/fit":
+            return self._responder(404, {"erro": "rota desconhecida"})
+        try:
+            pedido = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not isinstance(pedido, dict):
+                raise ValueError("o corpo deve ser um objeto JSON")
+            experimento = {chave: pedido[chave] for chave in ("arquivo", "E0", "s0_a", "s0_b")}
+            if pedido.get("lote"):
+                experimento["lote"] = pedido["lote"]
+            opcoes = opcoes_ajuste(pedido)
+        except (ValueError, KeyError) as e:
+            return self._responder(400, {"erro": f"pedido inválido: {e}"})
+        linha = self.server.pool.submit(ajustar_experimento, experimento, opcoes).result()
+        self.server.atendidos += 1
+        self._responder(200 if not linha["erro"] else 422, linha)
+
+    def log_message(self, formato, *args):
+        sys.stderr.write(f"[servico] {formato % args}\n")
+
+def comando_servir(args):
+    inicio = _time.perf_counter()
+    servidor = ServicoAjuste((args.endereco, args.porta), args.processos)
+    print(f"Serviço em http://{args.endereco}:{args.porta} ({servidor.processos} processos, "
+          f"pronto em {_time.perf_counter() - inicio:.1f} s)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+## Consulta ao banco de resultados
+def comando_consultar(args):
+    banco = BancoResultados(args.banco)
+    filtros = {"lote": args.lote} if args.lote else {}
+    grupos = banco.distribuicao(args.coluna, por=args.por, **filtros)
+    print(f"{len(banco)} ajustes em {banco.caminho}")
+    print(f"{args.por:>16} {'n':>6} {'mediana':>12} {'p5':>12} {'p95':>12}")
+    for grupo, valores in grupos.items():
+        p5, mediana, p95 = np.percentile(valores, [5, 50, 95])
+        print(f"{str(grupo):>16} {len(valores):>6} {mediana:>12.4g} {p5:>12.4g} {p95:>12.4g}")
+    return 0
+
+## Tempo de inicialização
+def medir_inicio(repeticoes=3):
+    """Menor tempo (s) para um interpretador novo importar o caminho sem gráficos e módulos carregados indevidamente."""
+    codigo = ("import sys, time; t = time.perf_counter(); import cli_modelagem, funcoes_modelagem_final; "
+              "print(time.perf_counter() - t); print(','.join(m for m in %r if m in sys.modules))"
+              % (MODULOS_PROIBIDOS,))
+    tempos, proibidos = [], ""
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+        linhas = saida.stdout.splitlines()
+        tempos.append(float(linhas[0]))
+        proibidos = linhas[1] if len(linhas) > 1 else ""
+    return min(tempos), [m for m in proibidos.split(",") if m]
+
+def comando_inicio(args):
+    segundos, proibidos = medir_inicio()
+    dentro = segundos <= args.orcamento and not proibidos
+    print(f"importação: {segundos:.3f} s (orçamento {args.orcamento:.2f} s)"
+          + (f"; módulos indevidos: {', '.join(proibidos)}" if proibidos else "")
+          + (" ok" if dentro else " ACIMA DO ORÇAMENTO"))
+    return 0 if dentro else 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cli_modelagem",
+                                     description="Ajuste do modelo ping-pong bi-bi sem interface gráfica.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    fit = comandos.add_parser("fit", help="ajusta um arquivo de dados (Excel, CSV ou Parquet)")
+    fit.add_argument("arquivo")
+    fit.add_argument("--E0", type=float, required=True)
+    fit.add_argument("--s0_a", type=float, required=True)
+    fit.add_argument("--s0_b", type=float, required=True)
+    fit.add_argument("--maxiter", type=int, default=OPCOES_PADRAO["maxiter"])
+    fit.add_argument("--popsize", type=int, default=OPCOES_PADRAO["popsize"])
+    fit.add_argument("--seed", type=int, default=None)
+    fit.add_argument("--refinamento", action="store_true", help="ajuste em duas etapas (DE curto + mínimos quadrados)")
+    fit.add_argument("--qssa", action="store_true", help="semeia o DE com a estimativa QSSA")
+    fit.add_argument("--log", dest="escala", action="store_const", const="log", default="linear",
+                     help="busca das constantes em escala log10")
+    fit.add_argument("--inicios", type=int, default=None,
+                     help="buscas globais simultâneas com reinícios e eliminação das atrasadas (ver ajuste_multiplo)")
+    fit.add_argument("--motor", default=None, choices=("trf", "de", "hibrido", "multiplo"),
+                     help="motor de ajuste (ver motores_ajuste); padrão: escolhido por --refinamento/--inicios")
+    fit.add_argument("--perda", default=None, choices=("sse", "relativo", "log", "huber"),
+                     help="função de erro do ajuste (padrão: sse)")
+    fit.add_argument("--banco", default=None, help="banco SQLite de resultados (reaproveita ajustes iguais)")
+    fit.add_argument("--lote", default=None, help="lote da enzima, gravado com o ajuste no banco")
+    fit.add_argument("--json", default=None, help="grava a linha de resumo em JSON")
+    fit.add_argument("--grafico", default=None, help="grava a figura do ajuste (PNG, SVG, ...)")
+    fit.set_defaults(funcao=comando_fit)
+
+    servir = comandos.add_parser("servir", help="serviço HTTP/JSON local com pool de processos aquecido")
+    servir.add_argument("--endereco", default="127.0.0.1")
+    servir.add_argument("--porta", type=int, default=8765)
+    servir.add_argument("--processos", type=int, default=None, help="tamanho do pool (padrão: todos os núcleos)")
+    servir.set_defaults(funcao=comando_servir)
+
+    consultar = comandos.add_parser("consultar", help="distribuição de uma coluna dos ajustes guardados no banco")
+    consultar.add_argument("--banco", default=BANCO_PADRAO)
+    consultar.add_argument("--coluna", default="Km_A")
+    consultar.add_argument("--por", default="lote", help="coluna usada para agrupar")
+    consultar.add_argument("--lote", default=None, help="só os ajustes deste lote")
+    consultar.set_defaults(funcao=comando_consultar)
+
+    inicio = comandos.add_parser("inicio", help="mede o tempo de importação do caminho sem gráficos")
+    inicio.add_argument("--orcamento", type=float, default=ORCAMENTO_INICIO)
+    inicio.set_defaults(funcao=comando_inicio)
+
+    args = parser.parse_args(argv)
+    return args.funcao(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+## Leitura dos dados experimentais (Excel, CSV ou Parquet)
+# A planilha é convertida uma única vez para um arquivo colunar (.npy) na pasta de cache,
+# identificado pelo hash do conteúdo do arquivo; as execuções seguintes apenas mapeiam
+# esse arquivo em memória (np.load com mmap_mode) em vez de interpretar o .xlsx de novo.
+import hashlib
+import os
+
+import numpy as np
+
+# Colunas lidas do arquivo, na ordem em que são guardadas no cache
+COLUNAS = ("tempo", "Produto 1", "Produto 2")
+VERSAO_CACHE = "1"  # Alterar invalida os arquivos de cache antigos
+PASTA_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "modelagem_enzimatica", "dados")
+
+# Tratamento dos pontos sem medida em Produto 1/Produto 2:
+#   "manter"  - ficam como NaN e são ignorados no ajuste
+#   "remover" - remove as linhas com alguma medida faltando
+#   "zero"    - preenche com 0 (comportamento antigo, fillna(0))
+POLITICAS_NAN = ("manter", "remover", "zero")
+
+#Hash do conteúdo do arquivo (lido em blocos)
+def hash_arquivo(caminho, bloco=1 << 20):
+    h = hashlib.sha1(VERSAO_CACHE.encode())
+    with open(caminho, "rb") as arquivo:
+        for parte in iter(lambda: arquivo.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+#Lê as colunas do arquivo conforme a extensão. Retorna um array (3, N) de floats
+def ler_tabela(caminho):
+    import pandas as pd  # Só é necessário quando o cache não tem o arquivo
+
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in (".xlsx", ".xls"):
+        data = pd.read_excel(caminho, index_col=None)
+    elif extensao == ".csv":
+        data = pd.read_csv(caminho)
+    elif extensao == ".parquet":
+        data = pd.read_parquet(caminho)
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: {extensao} (use .xlsx, .xls, .csv ou .parquet).")
+
+    faltando = [coluna for coluna in COLUNAS if coluna not in data.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes em {os.path.basename(caminho)}: {', '.join(faltando)}.")
+    return np.vstack([pd.to_numeric(data[coluna], errors="coerce").to_numpy(dtype=float) for coluna in COLUNAS])
+
+#Tabela do arquivo, passando pelo cache colunar quando possível
+def carregar_tabela(caminho, pasta_cache=PASTA_CACHE):
+    """pasta_cache: None lê o arquivo diretamente, sem cache.
+
+    Arquivos Parquet já são colunares e não passam pelo cache.
+    """
+    if pasta_cache is None or caminho.lower().endswith(".parquet"):
+        return ler_tabela(caminho)
+
+    arquivo_cache = os.path.join(pasta_cache, hash_arquivo(caminho) + ".npy")
+    if os.path.exists(arquivo_cache):
+        return np.load(arquivo_cache, mmap_mode="r")
+
+    tabela = ler_tabela(caminho)
+    os.makedirs(pasta_cache, exist_ok=True)
+    temporario = arquivo_cache + f".{os.getpid()}.tmp.npy"
+    np.save(temporario, tabela)
+    os.replace(temporario, arquivo_cache)  # Escrita atômica (vários processos podem ler o mesmo arquivo)
+    return np.load(arquivo_cache, mmap_mode="r")
+
+#Validação vetorizada da tabela. Retorna tempo, produto_1 e produto_2
+def validar_dados(tabela, nan="manter"):
+    if nan not in POLITICAS_NAN:
+        raise ValueError(f"Política de NaN inválida: {nan} (use {', '.join(POLITICAS_NAN)}).")
+    time, produto_1, produto_2 = tabela
+    sem_tempo = np.isnan(time)
+    sem_produto = np.isnan(produto_1) | np.isnan(produto_2)
+
+    # Linhas totalmente vazias são descartadas; medida sem tempo é erro
+    if np.any(sem_tempo & ~(np.isnan(produto_1) & np.isnan(produto_2))):
+        linha = int(np.argmax(sem_tempo & ~(np.isnan(produto_1) & np.isnan(produto_2)))) + 2
+        raise ValueError(f"Medida sem valor de tempo (linha {linha} do arquivo).")
+    manter = ~sem_tempo
+    if nan == "remover":
+        manter &= ~sem_produto
+    if not np.all(manter):
+        time, produto_1, produto_2 = time[manter], produto_1[manter], produto_2[manter]
+
+    if time.size < 2:
+        raise ValueError("São necessários ao menos dois pontos de tempo.")
+    if not np.all(np.isfinite(time)):
+        raise ValueError("A coluna tempo contém valores não numéricos.")
+    if np.any(np.diff(time) <= 0):
+        raise ValueError("A coluna tempo deve ser estritamente crescente.")
+
+    if nan == "zero":
+        produto_1, produto_2 = np.nan_to_num(produto_1, nan=0.0), np.nan_to_num(produto_2, nan=0.0)
+    return time, produto_1, produto_2
+
+def carregar_dados(caminho, nan="manter", pasta_cache=PASTA_CACHE):
+    """Lê e valida um arquivo de dados experimentais (tempo em float, produtos com NaN tratados)."""
+    return validar_dados(carregar_tabela(caminho, pasta_cache), nan)
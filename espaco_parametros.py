@@ -0,0 +1,85 @@
+## Espaço de busca das constantes cinéticas
+# O otimizador trabalha em x; as constantes são k = x (escala linear) ou k = 10**x (escala log).
+# Em escala log o DE distribui a população igualmente entre as ordens de grandeza, e os
+# limites podem cobrir várias décadas sem desperdiçar avaliações na região de k grande.
+import numpy as np
+from scipy.optimize import NonlinearConstraint
+
+ESCALAS = ("linear", "log")
+# Limites padrão de cada escala (os mesmos seis para k1, k_1, k2, k3, k_3, k4)
+LIMITES_PADRAO = {"linear": [(0.01, 10)] * 6, "log": [(1e-3, 1e3)] * 6}
+# Ordem exigida entre os Km: "A<B" (Km_A <= Km_B), "B<A" (Km_B <= Km_A) ou None
+ORDENS_KM = ("A<B", "B<A")
+
+
+class EspacoParametros:
+    """Escala, limites por constante e restrição opcional de ordem dos Km.
+
+    bounds: lista de seis (mínimo, máximo) em unidades das constantes; None usa os limites
+    da estimativa QSSA, quando houver, ou LIMITES_PADRAO.
+    """
+
+    def __init__(self, escala="linear", bounds=None, ordem_km=None):
+        if escala not in ESCALAS:
+            raise ValueError(f"Escala inválida: {escala} (use {', '.join(ESCALAS)}).")
+        if ordem_km is not None and ordem_km not in ORDENS_KM:
+            raise ValueError(f"Ordem dos Km inválida: {ordem_km} (use {', '.join(ORDENS_KM)} ou None).")
+        if bounds is not None:
+            bounds = [(float(lo), float(hi)) for lo, hi in bounds]
+            if len(bounds) != 6 or any(not 0 < lo < hi for lo, hi in bounds):
+                raise ValueError("bounds deve ter seis pares (mínimo, máximo) positivos e crescentes.")
+        self.escala = escala
+        self.bounds = bounds
+        self.ordem_km = ordem_km
+
+    def __repr__(self):
+        return f"EspacoParametros({self.escala!r}, {self.bounds!r}, {self.ordem_km!r})"
+
+    @property
+    def identidade(self):
+        return self.escala == "linear"
+
+    def limites_padrao(self):
+        return self.bounds if self.bounds is not None else LIMITES_PADRAO[self.escala]
+
+    #Conversões entre o espaço do otimizador e as constantes (aceitam (6,) ou (6, S))
+    def para_constantes(self, x):
+        return x if self.identidade else 10.0 ** np.asarray(x)
+
+    def para_otimizador(self, k):
+        return np.asarray(k, dtype=float) if self.identidade else np.log10(k)
+
+    def derivada(self, x):
+        """dk/dx de cada constante (regra da cadeia do jacobiano)."""
+        return np.ones_like(x) if self.identidade else np.log(10) * 10.0 ** np.asarray(x)
+
+    def limites_otimizador(self, bounds):
+        return [tuple(self.para_otimizador(par)) for par in bounds]
+
+    def diferenca_km(self, x):
+        """Km_A - Km_B das constantes correspondentes a x.
+
+        Com x (6, S) (differential_evolution vectorized) devolve (1, S), como o DE espera.
+        """
+        k1, k_1, k2, k3, k_3, k4 = self.para_constantes(x)
+        diferenca = (k_1 + k2) / k1 - (k_3 + k4) / k3
+        return diferenca.reshape(1, -1) if np.ndim(x) == 2 else diferenca
+
+    def restricao(self):
+        """Restrição do differential_evolution para a ordem dos Km (None sem restrição)."""
+        if self.ordem_km is None:
+            return ()
+        if self.ordem_km == "A<B":
+            return NonlinearConstraint(self.diferenca_km, -np.inf, 0)
+        return NonlinearConstraint(self.diferenca_km, 0, np.inf)
+
+    def respeita(self, x):
+        """Verdadeiro se x satisfaz a ordem dos Km."""
+        if self.ordem_km is None:
+            return True
+        diferenca = self.diferenca_km(x)
+        return diferenca <= 0 if self.ordem_km == "A<B" else diferenca >= 0
+
+#Função objetivo no espaço do otimizador (nível de módulo para poder ir ao pool)
+def objetivo_espaco(x, espaco, funcao, *args):
+    return funcao(espaco.para_constantes(x), *args)
@@ -0,0 +1,155 @@
+## Simulação e varredura de parâmetros do mecanismo ping-pong bi-bi
+# plot_sim: simulação única usada pela tela de Simulação.
+# varredura: milhares de simulações (grades de E0, s0_a, s0_b e das constantes) integradas
+# em lote, com mapas de conversão x tempo e de tempo até X% de conversão.
+#
+# Exemplo:
+#   grade = grade_parametros(E0=[0.05, 0.1, 0.2], s0_b=np.linspace(0.5, 3, 20), k2=[0.4, 0.8, 1.6])
+#   r = varredura(np.linspace(0, 120, 241), grade, s0_a=1.0, k=(1, .5, .8, 1.2, .3, .6), alvos=(50, 90))
+#   r["tempo_conversao"][90]   # array (3, 20, 3): tempo para 90% de conversão em cada ponto
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from funcoes_modelagem_final import modelo, f_conversao, condicoes_iniciais, kinetic_model, simular_lote
+
+# Ordem das constantes no vetor de parâmetros de eq_dif
+CONSTANTES = ("k1", "k_1", "k2", "k3", "k_3", "k4")
+# Variáveis que podem ser varridas
+VARIAVEIS = ("E0", "s0_a", "s0_b") + CONSTANTES
+TAMANHO_BLOCO = 500  # Simulações integradas juntas em cada chamada de simular_lote
+
+#Produto cartesiano das grades informadas
+def grade_parametros(**grades):
+    """Cada argumento (ver VARIAVEIS) recebe uma lista de valores.
+
+    Retorna {nome: array com a forma da grade}; a ordem dos eixos é a dos argumentos.
+    """
+    invalidas = [nome for nome in grades if nome not in VARIAVEIS]
+    if invalidas:
+        raise ValueError(f"Variáveis desconhecidas na grade: {', '.join(invalidas)}.")
+    eixos = np.meshgrid(*[np.atleast_1d(np.asarray(v, dtype=float)) for v in grades.values()], indexing="ij")
+    return dict(zip(grades, eixos))
+
+#Integra um bloco de simulações (nível de módulo para poder ir ao pool de processos)
+def _simular_bloco(t, params, y0, solver):
+    return simular_lote(t, params, y0, solver)
+
+#Trajetórias de M simulações. params: (M, 6), y0: (8, M). Retorna (8, M, T)
+def simular_varias(t, params, y0, solver=None, processos=1, bloco=TAMANHO_BLOCO):
+    M = params.shape[0]
+    inicios = range(0, M, bloco)
+    argumentos = [(t, params[i:i + bloco], y0[:, i:i + bloco], solver) for i in inicios]
+    if processos == 1 or len(argumentos) == 1:
+        partes = [_simular_bloco(*a) for a in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            partes = list(pool.map(_simular_bloco, *zip(*argumentos)))
+    return np.concatenate(partes, axis=1)
+
+#Primeiro tempo em que a conversão atinge o alvo (interpolação linear); NaN se não atingir
+def tempo_ate_conversao(t, conversao, alvo):
+    """conversao: (..., T). Retorna um array com a forma (...)."""
+    atingiu = conversao >= alvo
+    j = np.argmax(atingiu, axis=-1)
+    nunca = ~np.take_along_axis(atingiu, j[..., None], axis=-1)[..., 0]
+    anterior = np.maximum(j - 1, 0)
+    c0 = np.take_along_axis(conversao, anterior[..., None], axis=-1)[..., 0]
+    c1 = np.take_along_axis(conversao, j[..., None], axis=-1)[..., 0]
+    t0, t1 = t[anterior], t[j]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fracao = np.where(c1 > c0, (alvo - c0) / (c1 - c0), 0.0)
+    tempo = np.where(j == 0, t[0], t0 + np.clip(fracao, 0, 1) * (t1 - t0))
+    return np.where(nunca, np.nan, tempo)
+
+def varredura(t, grade, E0=0.1, s0_a=1.0, s0_b=1.0, k=(1, 1, 1, 1, 1, 1), alvos=(50, 90),
+              solver=None, processos=1, bloco=TAMANHO_BLOCO):
+    """Simula todos os pontos da grade (ver grade_parametros).
+
+    As variáveis fora da grade usam os valores fixos E0, s0_a, s0_b e k.
+    Retorna um dicionário com:
+      t: tempos simulados
+      y: trajetórias (8, *forma, T)
+      conversao: conversão de B (%) com forma (*forma, T)
+      tempo_conversao: {alvo: tempo até alvo% de conversão, forma (*forma)}
+    """
+    t = np.asarray(t, dtype=float)
+    forma = next(iter(grade.values())).shape if grade else ()
+    fixos = dict(zip(VARIAVEIS, (E0, s0_a, s0_b) + tuple(k)))
+    valores = {nome: np.broadcast_to(grade.get(nome, fixos[nome]), forma).ravel() for nome in VARIAVEIS}
+
+    params = np.column_stack([valores[nome] for nome in CONSTANTES])
+    zeros = np.zeros_like(valores["E0"])
+    y0 = np.array([np.broadcast_to(v, zeros.shape) for v in
+                   condicoes_iniciais(valores["E0"], valores["s0_a"], valores["s0_b"], [zeros], [zeros])])
+    y = simular_varias(t, params, y0, solver, processos, bloco)
+
+    # Conversão calculada pelo produto B em relação ao substrato B inicial
+    conversao = f_conversao(valores["s0_b"][:, None], y[7])
+    conversao = conversao.reshape(forma + (len(t),))
+    return {"t": t, "y": y.reshape((8,) + forma + (len(t),)), "conversao": conversao,
+            "tempo_conversao": {alvo: tempo_ate_conversao(t, conversao, alvo) for alvo in alvos}}
+
+## Simulação única da tela de Simulação
+# Kcat_a, Kcat_b: constantes catalíticas de cada meia-reação usadas no Vmax da equação de
+# velocidade; 0 usa k2 e k4 do mecanismo. t_input: tempo final da simulação (min)
+def plot_sim(E0, Kcat_a, Kcat_b, s0_a, s0_b, t_input, k1, k_1, k2, k3, k_3, k4):
+    """Simular o mecanismo com as constantes informadas e mostrar os gráficos."""
+    import matplotlib.pyplot as plt
+
+    if t_input <= 0:
+        raise ValueError("O tempo de simulação deve ser positivo.")
+    k_params = (k1, k_1, k2, k3, k_3, k4)
+    time = np.linspace(0, t_input, 500)
+    y0 = condicoes_iniciais(E0, s0_a, s0_b, [0], [0])
+    sol = kinetic_model(time, k_params, y0, {"method": "LSODA"})
+
+    Vmax = E0 * min(Kcat_a or k2, Kcat_b or k4)
+    v = modelo(Vmax, k_1, k1, k2, k_3, k4, k3, sol.y[1], sol.y[4])
+    conversao = f_conversao(s0_b, sol.y[7])
+
+    plt.figure(figsize=(12, 8))
+
+    #Gráfico das concentrações pelo tempo
+    plt.subplot(2, 2, 1)
+    plt.plot(time, sol.y[1], '-', color='darkorange', label='Substrato A')
+    plt.plot(time, sol.y[4], '-', color='slateblue', label='Substrato B')
+    plt.plot(time, sol.y[6], '-', color='b', label='Produto 1')
+    plt.plot(time, sol.y[7], '-', color='r', label='Produto 2')
+    plt.title('Concentração x Tempo', fontsize=12, weight='bold')
+    plt.xlabel('Tempo (min)', fontsize=10, weight='bold')
+    plt.ylabel('Concentração (M)', fontsize=10, weight='bold')
+    plt.legend(loc='best')
+    plt.grid()
+
+    #Gráfico dos complexos enzimáticos
+    plt.subplot(2, 2, 2)
+    plt.plot(time, sol.y[0], '-', color='k', label='E')
+    plt.plot(time, sol.y[2], '-', color='teal', label='ES1')
+    plt.plot(time, sol.y[3], '-', color='olive', label='E_P1')
+    plt.plot(time, sol.y[5], '-', color='purple', label='E_S2')
+    plt.title('Enzima x Tempo', fontsize=12, weight='bold')
+    plt.xlabel('Tempo (min)', fontsize=10, weight='bold')
+    plt.ylabel('Concentração (M)', fontsize=10, weight='bold')
+    plt.legend(loc='best')
+    plt.grid()
+
+    #Gráfico da velocidade pelo tempo
+    plt.subplot(2, 2, 3)
+    plt.plot(time, v, '-', color='firebrick')
+    plt.title(f'Velocidade x Tempo (Vmax = {Vmax:.4g})', fontsize=12, weight='bold')
+    plt.xlabel('Tempo (min)', fontsize=10, weight='bold')
+    plt.ylabel('Velocidade (M/min)', fontsize=10, weight='bold')
+    plt.grid()
+
+    #Gráfico da conversão pelo tempo
+    plt.subplot(2, 2, 4)
+    plt.plot(time, conversao, '-', color='seagreen')
+    plt.title('Conversão x Tempo', fontsize=12, weight='bold')
+    plt.xlabel('Tempo (min)', fontsize=10, weight='bold')
+    plt.ylabel('Conversão (%)', fontsize=10, weight='bold')
+    plt.grid()
+
+    plt.tight_layout()
+    plt.show()
+    return sol
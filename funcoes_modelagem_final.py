@@ -1,8 +1,13 @@
 import numpy as np  # Biblioteca para cálculos numéricos
-import pandas as pd  # Biblioteca para manipulação de dados
-import matplotlib.pyplot as plt  # Biblioteca para plotar gráficos
+# Sem matplotlib: os gráficos ficam em graficos_modelagem
 from scipy.integrate import solve_ivp  # Resolve equações diferenciais
-from scipy.optimize import differential_evolution  # Ajuste de curvas
+from scipy.sparse import csc_matrix  # Jacobiano esparso da integração em lote
+from scipy.optimize import differential_evolution, least_squares  # Ajuste de curvas
+from integrador_numba import integrar_compilado, integrar_compilado_lote, NUMBA_DISPONIVEL  # Integrador compilado (opcional)
+from cache_modelagem import CacheSolucoes  # Cache de soluções e populações
+from dados_modelagem import carregar_dados  # Leitura dos dados com cache colunar
+from qssa_modelagem import estimar_qssa, populacao_qssa, limites_qssa  # Estimativa rápida de Vmax/Km
+from espaco_parametros import EspacoParametros, objetivo_espaco  # Escala log e limites das constantes
 
 #Função do modelo
 def modelo(Vmax,k_1, k1, k2, k_3, k4, k3, A, B):
@@ -32,163 +37,566 @@ def eq_dif(t, y, k1, k_1, k2, k3, k_3, k4):
 
 	return [dEdt, dS1dt, dES1dt, dE_P1dt, dS2dt, dE_S2dt, dP1dt, dP2dt] # Retorna as taxas de variação
 
-## Função que irá gerar a visualização final da tela e realizará todo o calculo da modelagem
-# Essa função precisa do caminho da base de dados que o usuário irá inserir e do valor de E0
-def funcao_final(file_path, E0, s0_a, s0_b, adjustments, maxiter, popsize, mutation, recombination):
-
-    #Função da leitura dos dados fornecidos pelo usuário
-    def read_data_from_excel(file_path):
-        """
-        Leitura dos dados de concentração e tempo de substratos a partir de um arquivo Excel.
-        """
-        data = pd.read_excel(file_path, index_col=None, dtype={'tempo': int,  'Produto 1': float,  'Produto 2': float})
-        time = data['tempo'].values
-        #substrate_1 = data['Substrato 1'].fillna(0).values
-        substrate_1 = s0_a
-        substrate_2 = s0_b
-        #substrate_2 = data['Substrato 2'].fillna(0).values
-        produto_1 = data['Produto 1'].fillna(0).values
-        produto_2 = data['Produto 2'].fillna(0).values
-        return time, substrate_1, substrate_2, produto_1, produto_2
-
-    time, substrate_1, substrate_2, produto_1, produto_2 = read_data_from_excel(file_path)
- 
-    # Função do modelo cinético
-    def kinetic_model(t, k_params):
-        """Simular os dados com os parâmetros cinéticos."""
-        k1, k_1, k2, k3, k_3, k4 = k_params
-        y0 = [E0, substrate_1, 0, 0, substrate_2, 0, produto_1[0], produto_2[0]] #condições iniciais 
-        sol = solve_ivp(eq_dif, [t[0], t[-1]], y0, t_eval=t, args=k_params) # Resolve EDO
-        return sol ## Retorna vetores ao longo do tempo com o resultado da EDO
-
-    # Ajuste dos parâmetros que serão usados no modelo 
-    def ajustar_parametros(time, produto_1, produto_2):
-        def calculate_kinetics(time, produto_1, produto_2):
-            """Ajustar os parâmetros cinéticos com base nos dados experimentais."""
-                    
-            # def objetivo(params):
-            #     k1, k_1, k2, k3, k_3, k4 = params
-            #     k_params = (k1, k_1, k2, k3, k_3, k4)
-            #     sol = kinetic_model(time, k_params)
-            #     erro_P1 = np.sum((sol.y[6] - produto_1) ** 2)
-            #     erro_P2 = np.sum((sol.y[7] - produto_2) ** 2)
-            #     return erro_P1 + erro_P2
-
-            def objetivo(params):
-                k1, k_1, k2, k3, k_3, k4 = params
-                k_params = (k1, k_1, k2, k3, k_3, k4)
-                sol = kinetic_model(time, k_params)
-                
-                errors = []
-                if adjustments.get("S1_adjust", False):
-                    erro_S1 = np.sum((sol.y[1] - substrate_1) ** 2)
-                    errors.append(erro_S1)
-                if adjustments.get("S2_adjust", False):
-                    erro_S2 = np.sum((sol.y[4] - substrate_2) ** 2)
-                    errors.append(erro_S2)
-                if adjustments.get("P1_adjust", False):
-                    erro_P1 = np.sum((sol.y[6] - produto_1) ** 2)
-                    errors.append(erro_P1)
-                if adjustments.get("P2_adjust", False):
-                    erro_P2 = np.sum((sol.y[7] - produto_2) ** 2)
-                    errors.append(erro_P2)
-                
-                if errors:
-                    return sum(errors)  
-                else:
-                    return None
-
-            bounds = [(0.01, 10)] * 6  # Limites para os parâmetros
-
-            result = differential_evolution(objetivo, bounds, maxiter=maxiter, popsize=popsize, mutation=mutation, recombination=recombination)
-
-            return result.x
-    
-        # Calcula Km e Vmax
-        k1, k_1, k2, k3, k_3, k4 = calculate_kinetics(time, produto_1, produto_2)
-        Km_A = (k_1 + k2) / k1 # Cálculo de Km para substrato A
-        Km_B = (k_3 + k4) / k3 # Cálculo de Km para substrato B
-        Vmax = E0 * min(k2,k4)            #Cálculo da Velocidade Máxima
-    
-        return k1, k_1, k2, k3, k_3, k4, Km_A, Km_B, Vmax
-
-    # Encontrando as constantes necessárias
-    k1, k_1, k2, k3, k_3, k4, Km_A, Km_B, Vmax = ajustar_parametros(time, produto_1, produto_2)
-    
-
-    # Plotagem dos resultados
-    def plot_results(time, k1, k_1, k2, k3, k_3, k4):
-        #print("Os parâmetros cinéticos calculados com base nos dados experimentais são:")
-        #print("k1:", k1," k2:", k2,"k3:", k3, "k4:", k4, "Km_A:",  Km_A , "Km_B:", Km_B, "Vmax:", Vmax)
-        """Gerar os gráficos com os resultados simulados e experimentais."""
-        y0 = [E0, substrate_1, 0, 0, substrate_2, 0, 0, 0]
-        sol = solve_ivp(eq_dif, [time[0], time[-1]], y0, t_eval=time, args=(k1, k_1, k2, k3, k_3, k4))
-
-        # Cálculo da Velocidade
-        #v = (Vmax * substrate1 * substrate2) / (substrate2 * Km_A + substrate1 * Km_B + substrate1 * substrate2) 
-        v = (Vmax * sol.y[1] * sol.y[4]) / (sol.y[4] * Km_A + sol.y[1] * Km_B + sol.y[1] * sol.y[4]) 
-        
-        ## Gráfico da Velocidade x Substrato
-        plt.figure(figsize=(12, 8))
-        plt.subplot(2, 2, 1)
-        plt.plot(sol.y[1], v, '-', color='firebrick', label='substrato 1', markersize=3)
-        plt.plot(sol.y[4], v, '--', color='darkorange', label = 'Substrato 2', markersize=3)
-        plt.title('Velocidade x Substrato', fontsize=12, weight='bold')
-        plt.xlabel('Concentração de Substrato (mol/L)', fontsize=10, weight='bold')
-        plt.ylabel('Velocidade (mol/L/min)', fontsize=10, weight='bold')
-        plt.legend(loc='best')
-        plt.grid()
-
-        # Lineweaver-Burk
-        inv_v = 1 / v
-        inv_s1 = 1 / sol.y[1]
-        inv_s2 = 1 / sol.y[4]
-        
-        ## Gráfico da Lineweaver-Burk x Substrato
-        plt.subplot(2, 2, 2)
-        np.seterr(divide='ignore', invalid='ignore')
-        plt.plot(inv_s1, inv_v, 'o-', color = 'firebrick',label='substrato 1', markersize=3)
-        plt.plot(inv_s2, inv_v, 'o--', color = 'darkorange',label='substrato 2', markersize=3)
-        plt.title('Lineweaver-Burk Plot', fontsize=12, weight='bold')
-        plt.xlabel('1/[Substrato] (1/mol/L)', fontsize=10, weight='bold')
-        plt.ylabel('1/Velocidade (1/(mol/L/min)', fontsize=10, weight='bold')
-        plt.legend(loc='best')
-        plt.grid()
-
-        ## Gráfico da Concentração do Substrato e Produto pelo Tempo
-        plt.subplot(2, 2, 3)
-        plt.plot(time, sol.y[1], ls='-', color='firebrick', label='Substrato 1')
-        plt.plot(time, sol.y[4], ls='--', color='darkorange', label='Substrato 2')
-        plt.plot(time, sol.y[6], ls='-.', color='navy', label ='Produto 1')
-        plt.plot(time, sol.y[7], ls=':', color='dodgerblue', label ='Produto 2')
-        plt.scatter(time, produto_1, color='navy', marker='o', label='Produto 1 (experimental)')
-        plt.scatter(time, produto_2, color='dodgerblue', marker='s', label='Produto 2 (experimental)')
-        plt.title('Concentração x Tempo', fontsize=12, weight='bold')
-        plt.xlabel('Tempo (min)', fontsize=10, weight='bold')
-        plt.ylabel('Concentração (mol/L)', fontsize=10, weight='bold')
-        plt.legend(loc='best')
-        plt.grid()
-
-        # Calculo da Conversão vs Tempo
-        conversao = 100 * sol.y[7] / substrate_2
-           
-        #Gráfico da Concentração pelo tempo
-        plt.subplot(2, 2, 4)
-        plt.plot(time, conversao, '-', color='seagreen')
-        plt.title('Conversão x Tempo', fontsize=12, weight='bold')
-        plt.xlabel('Tempo (min)', fontsize=10, weight='bold')
-        plt.ylabel('Conversão de Acetato de geranila (%)', fontsize=10, weight='bold')
-        plt.legend(loc='best')
-        plt.grid()
-
-        plt.tight_layout()
-        plt.show()
-
-    return ajustar_parametros(time, produto_1, produto_2), plot_results(time, k1, k_1, k2, k3, k_3, k4)
-
-
-    
-
-   
-
-    
\ No newline at end of file
+#Jacobiano analítico de eq_dif (d(dy/dt)/dy), usado pelos integradores implícitos
+def jac_eq_dif(t, y, k1, k_1, k2, k3, k_3, k4):
+    E, S1, ES1, E_P1, S2, E_S2, P1, P2 = y
+    J = np.zeros((8, 8))
+
+    # Linhas: E, S1, ES1, E_P1, S2, E_S2, P1, P2 (mesma ordem das colunas)
+    J[0, 0], J[0, 1], J[0, 2], J[0, 5] = -k1 * S1, -k1 * E, k_1, k4
+    J[1, 0], J[1, 1], J[1, 2] = -k1 * S1, -k1 * E, k_1
+    J[2, 0], J[2, 1], J[2, 2] = k1 * S1, k1 * E, -k_1 - k2
+    J[3, 2], J[3, 3], J[3, 4], J[3, 5] = k2, -k3 * S2, -k3 * E_P1, k_3
+    J[4, 3], J[4, 4], J[4, 5] = -k3 * S2, -k3 * E_P1, k_3
+    J[5, 3], J[5, 4], J[5, 5] = k3 * S2, k3 * E_P1, -k_3 - k4
+    J[6, 2] = k2
+    J[7, 5] = k4
+
+    return J
+
+#Versão vetorizada de eq_dif
+# y pode ser (8,) ou (8, M) e params (6,) ou (M, 6): cada coluna de y usa a linha
+# correspondente de params. Também serve para solve_ivp(vectorized=True)
+def eq_dif_vetorizado(t, y, params):
+    k1, k_1, k2, k3, k_3, k4 = np.asarray(params, dtype=float).T
+    E, S1, ES1, E_P1, S2, E_S2, P1, P2 = y
+
+    # Velocidades líquidas de cada etapa do mecanismo
+    v1 = k1 * E * S1 - k_1 * ES1    # E + S1 <-> ES1
+    v2 = k2 * ES1                   # ES1 -> E_P1 + P1
+    v3 = k3 * E_P1 * S2 - k_3 * E_S2  # E_P1 + S2 <-> E_S2
+    v4 = k4 * E_S2                  # E_S2 -> E + P2
+
+    return np.array([-v1 + v4, -v1, v1 - v2, v2 - v3, -v3, v3 - v4, v2, v4])
+
+#Matriz estequiométrica: colunas são as etapas v1..v4 de eq_dif_vetorizado
+ESTEQUIOMETRIA = np.array([
+    [-1, 0, 0, 1],   # E
+    [-1, 0, 0, 0],   # S1
+    [1, -1, 0, 0],   # ES1
+    [0, 1, -1, 0],   # E_P1
+    [0, 0, -1, 0],   # S2
+    [0, 0, 1, -1],   # E_S2
+    [0, 1, 0, 0],    # P1
+    [0, 0, 0, 1],    # P2
+], dtype=float)
+
+#Equações de sensibilidade direta: dS/dt = J S + df/dk, com S = dy/dk (8 x 6)
+# Estado aumentado z = [y (8), S achatado (48)]
+def eq_dif_sensibilidade(t, z, k1, k_1, k2, k3, k_3, k4):
+    y = z[:8]
+    S = z[8:].reshape(8, 6)
+    E, S1, ES1, E_P1, S2, E_S2, P1, P2 = y
+
+    # Derivadas das velocidades v1..v4 em relação a (k1, k_1, k2, k3, k_3, k4)
+    dv_dk = np.array([
+        [E * S1, -ES1, 0, 0, 0, 0],
+        [0, 0, ES1, 0, 0, 0],
+        [0, 0, 0, E_P1 * S2, -E_S2, 0],
+        [0, 0, 0, 0, 0, E_S2],
+    ])
+    J = jac_eq_dif(t, y, k1, k_1, k2, k3, k_3, k4)
+    dS = J @ S + ESTEQUIOMETRIA @ dv_dk
+
+    dy = eq_dif_vetorizado(t, y, (k1, k_1, k2, k3, k_3, k4))
+    return np.concatenate([dy, dS.ravel()])
+
+#Sistema com M conjuntos de parâmetros empilhados em um único vetor de estado
+# Estado achatado na ordem (espécie, conjunto): y[i * M + m]
+def eq_dif_lote(t, y, params):
+    M = params.shape[0]
+    return eq_dif_vetorizado(t, y.reshape(8, M), params).ravel()
+
+#Jacobiano esparso (bloco-diagonal) de eq_dif_lote
+def jac_eq_dif_lote(t, y, params):
+    M = params.shape[0]
+    k1, k_1, k2, k3, k_3, k4 = params.T
+    E, S1, ES1, E_P1, S2, E_S2, P1, P2 = y.reshape(8, M)
+    entradas = [
+        (0, 0, -k1 * S1), (0, 1, -k1 * E), (0, 2, k_1), (0, 5, k4),
+        (1, 0, -k1 * S1), (1, 1, -k1 * E), (1, 2, k_1),
+        (2, 0, k1 * S1), (2, 1, k1 * E), (2, 2, -k_1 - k2),
+        (3, 2, k2), (3, 3, -k3 * S2), (3, 4, -k3 * E_P1), (3, 5, k_3),
+        (4, 3, -k3 * S2), (4, 4, -k3 * E_P1), (4, 5, k_3),
+        (5, 3, k3 * S2), (5, 4, k3 * E_P1), (5, 5, -k_3 - k4),
+        (6, 2, k2),
+        (7, 5, k4),
+    ]
+    m = np.arange(M)
+    linhas = np.concatenate([i * M + m for i, j, v in entradas])
+    colunas = np.concatenate([j * M + m for i, j, v in entradas])
+    valores = np.concatenate([np.broadcast_to(v, (M,)) for i, j, v in entradas])
+    return csc_matrix((valores, (linhas, colunas)), shape=(8 * M, 8 * M))
+
+## Configuração do integrador
+# method: 'auto', 'numba' (integrador compilado), 'RK45', 'LSODA', 'BDF' ou 'Radau'
+# 'auto' usa o integrador compilado quando o Numba está instalado e, caso contrário,
+# detecta a rigidez do problema para escolher entre RK45 e LSODA
+SOLVER_PADRAO = {"method": "auto", "rtol": 1e-3, "atol": 1e-6}
+METODOS_IMPLICITOS = ("LSODA", "BDF", "Radau")  # Recebem o jacobiano analítico
+LIMITE_RIGIDEZ = 200  # Acima disso o problema é tratado como rígido
+
+# Cache compartilhado pelas execuções da interface (ver cache_modelagem.py)
+# Não é usado dentro da função objetivo: montar a chave custa mais que uma integração compilada
+CACHE_SOLUCOES = CacheSolucoes()
+
+#Índice de rigidez: maior autovalor do jacobiano (em módulo) vezes a duração do ensaio
+def indice_rigidez(t_span, y0, k_params):
+    J = jac_eq_dif(t_span[0], y0, *k_params)
+    lam = np.abs(np.linalg.eigvals(J).real).max()
+    return lam * (t_span[1] - t_span[0])
+
+#Escolha do método de integração
+def escolher_metodo(t_span, y0, k_params, solver):
+    method = solver.get("method", "auto")
+    if method == "numba" and not NUMBA_DISPONIVEL:
+        method = "auto"  # Sem o Numba volta para o SciPy
+    if method != "auto":
+        return method
+    if NUMBA_DISPONIVEL:
+        return "numba"
+    # Complexos enzimáticos relaxam muito mais rápido que os substratos quando os k são grandes
+    if indice_rigidez(t_span, y0, k_params) > LIMITE_RIGIDEZ:
+        return "LSODA"
+    return "RK45"
+
+## Resultado de um ajuste completo
+# Guarda tudo que foi calculado em uma única otimização, para ser reaproveitado
+# na plotagem, no relatório e na interface gráfica sem refazer o ajuste
+class FitResult:
+    """Constantes ajustadas, Km, Vmax, trajetória simulada e estatísticas do otimizador."""
+
+    def __init__(self, k1, k_1, k2, k3, k_3, k4, Km_A, Km_B, Vmax, time, sol, objetivo, nfev, nit,
+                 experimental=None):
+        self.k1 = k1
+        self.k_1 = k_1
+        self.k2 = k2
+        self.k3 = k3
+        self.k_3 = k_3
+        self.k4 = k4
+        self.Km_A = Km_A
+        self.Km_B = Km_B
+        self.Vmax = Vmax
+        self.time = time        # Tempos experimentais
+        self.sol = sol          # Solução da EDO com os parâmetros ajustados
+        self.objetivo = objetivo  # Valor final da função objetivo
+        self.nfev = nfev        # Número de avaliações da função objetivo
+        self.nit = nit          # Número de iterações (gerações) do otimizador
+        self.experimental = experimental  # Dados medidos {'Produto 1': ..., 'Produto 2': ...}
+        self.incerteza = None   # ResultadoIncerteza (ver incerteza.py), incluída no resumo quando calculada
+        self.historico = None   # Melhor objetivo a cada geração do DE
+        self.segundos = None    # Duração do ajuste
+        self.recuperado = False  # True quando veio do banco de resultados, sem rodar o otimizador
+        self.inicios = None     # RelatorioInicios (ver ajuste_multiplo.py) quando houve vários inícios
+
+    @property
+    def constantes(self):
+        """Constantes cinéticas na ordem usada por eq_dif."""
+        return (self.k1, self.k_1, self.k2, self.k3, self.k_3, self.k4)
+
+    def resumo(self):
+        """Texto com os parâmetros cinéticos para relatório e interface."""
+        return (
+            f"k1: {self.k1:.4f}\nk_1: {self.k_1:.4f}\nk2: {self.k2:.4f}\n"
+            f"k3: {self.k3:.4f}\nk_3: {self.k_3:.4f}\nk4: {self.k4:.4f}\n"
+            f"Km_A: {self.Km_A:.4f}\nKm_B: {self.Km_B:.4f}\nVmax: {self.Vmax:.4f}\n"
+            f"Objetivo: {self.objetivo:.4g}\nAvaliações: {self.nfev}\nIterações: {self.nit}"
+        ) + (f"\n{self.incerteza.resumo()}" if self.incerteza is not None else "") + (
+            f"\n{self.inicios.resumo()}" if self.inicios is not None else "")
+
+#Função da leitura dos dados fornecidos pelo usuário
+def read_data_from_excel(file_path, s0_a, s0_b, nan="manter"):
+    """
+    Leitura dos dados de concentração e tempo de substratos a partir de um arquivo Excel, CSV ou Parquet.
+    nan: tratamento das medidas faltando em Produto 1/Produto 2 (ver dados_modelagem.POLITICAS_NAN).
+    """
+    time, produto_1, produto_2 = carregar_dados(file_path, nan)
+    substrate_1 = s0_a
+    substrate_2 = s0_b
+    return time, substrate_1, substrate_2, produto_1, produto_2
+
+# Condições iniciais na ordem de eq_dif: E, S1, ES1, E_P1, S2, E_S2, P1, P2
+def condicoes_iniciais(E0, substrate_1, substrate_2, produto_1, produto_2):
+    # Produto sem medida no primeiro tempo parte de zero
+    return [E0, substrate_1, 0, 0, substrate_2, 0, np.nan_to_num(produto_1[0]), np.nan_to_num(produto_2[0])]
+
+# Função do modelo cinético
+def kinetic_model(t, k_params, y0, solver=None, cache=None):
+    """Simular os dados com os parâmetros cinéticos.
+
+    solver: dicionário com 'method', 'rtol' e 'atol' (ver SOLVER_PADRAO).
+    cache: CacheSolucoes opcional consultado antes de integrar.
+    """
+    solver = SOLVER_PADRAO if solver is None else {**SOLVER_PADRAO, **solver}
+    if cache is not None and cache.ativo:
+        chave = cache.chave(t, k_params, y0, solver)
+        sol = cache.obter(chave)
+        if sol is None:
+            sol = kinetic_model(t, k_params, y0, solver)
+            cache.guardar(chave, sol)
+        return sol
+
+    t_span = [t[0], t[-1]]
+    method = escolher_metodo(t_span, y0, k_params, solver)
+
+    if method == "numba":
+        sol = integrar_compilado(t, k_params, y0, solver["rtol"], solver["atol"])
+        if sol.success:
+            return sol
+        # Problema rígido demais para o método explícito: refaz com o LSODA
+        method = "LSODA"
+
+    opcoes = {"rtol": solver["rtol"], "atol": solver["atol"]}
+    if method in METODOS_IMPLICITOS:
+        opcoes["jac"] = jac_eq_dif
+
+    sol = solve_ivp(eq_dif, t_span, y0, method=method, t_eval=t, args=tuple(k_params), **opcoes) # Resolve EDO
+    return sol ## Retorna vetores ao longo do tempo com o resultado da EDO
+
+#Simulação em lote: integra M conjuntos de parâmetros de uma vez
+# params: (M, 6); y0: (8,) (comum a todos) ou (8, M). Retorna array (8, M, len(t))
+def simular_lote(t, params, y0, solver=None):
+    solver = SOLVER_PADRAO if solver is None else {**SOLVER_PADRAO, **solver}
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    M = params.shape[0]
+    y0 = np.broadcast_to(np.asarray(y0, dtype=float).reshape(8, -1), (8, M))
+
+    method = solver.get("method", "auto")
+    if M == 1:
+        # Um único conjunto não ganha nada com o sistema empilhado
+        return kinetic_model(t, params[0], y0[:, 0], solver).y[:, None, :]
+    if NUMBA_DISPONIVEL and method in ("auto", "numba"):
+        # O integrador compilado é mais rápido candidato a candidato do que o sistema empilhado
+        y, sucesso = integrar_compilado_lote(t, params, y0, solver["rtol"], solver["atol"])
+        for m in np.flatnonzero(~sucesso):
+            y[:, m] = kinetic_model(t, params[m], y0[:, m], {**solver, "method": "LSODA"}).y
+        return y
+
+    # Todos os conjuntos avançam com o mesmo passo, ditado pelo mais rígido deles;
+    # BDF aproveita o jacobiano bloco-diagonal esparso
+    if method in ("auto", "numba", "LSODA"):
+        method = "BDF"
+    opcoes = {"rtol": solver["rtol"], "atol": solver["atol"]}
+    if method in METODOS_IMPLICITOS:
+        opcoes["jac"] = jac_eq_dif_lote
+
+    sol = solve_ivp(eq_dif_lote, [t[0], t[-1]], y0.ravel(), method=method, t_eval=t, args=(params,), **opcoes)
+    if not sol.success:
+        return np.full((8, M, len(t)), np.nan)
+    return sol.y.reshape(8, M, len(t))
+
+#Trajetória e sensibilidades dy/dk nos tempos t. Retorna y (8, T) e S (8, 6, T)
+def simular_sensibilidades(t, k_params, y0, solver=None):
+    solver = SOLVER_PADRAO if solver is None else {**SOLVER_PADRAO, **solver}
+    # As condições iniciais não dependem dos k, então S(t0) = 0
+    z0 = np.concatenate([np.asarray(y0, dtype=float), np.zeros(48)])
+    sol = solve_ivp(eq_dif_sensibilidade, [t[0], t[-1]], z0, method="LSODA", t_eval=t,
+                    args=tuple(k_params), rtol=solver["rtol"], atol=solver["atol"])
+    return sol.y[:8], sol.y[8:].reshape(8, 6, -1)
+
+# Espécies que podem entrar no ajuste e sua posição no vetor de estado
+ESPECIES_AJUSTE = (("S1_adjust", 1), ("S2_adjust", 4), ("P1_adjust", 6), ("P2_adjust", 7))
+
+#Lista (índice da espécie, dados experimentais) das espécies selecionadas
+# Os substratos não são medidos: com s0 escalar, a curva de S1/S2 vem do balanço de massa
+# do produto correspondente (S = s0 - (P - P0), desprezando os complexos com a enzima)
+def observacoes(adjustments, substrate_1, substrate_2, produto_1, produto_2):
+    dados = {"S1_adjust": substrato_observado(substrate_1, produto_1),
+             "S2_adjust": substrato_observado(substrate_2, produto_2),
+             "P1_adjust": produto_1, "P2_adjust": produto_2}
+    return [(indice, dados[chave]) for chave, indice in ESPECIES_AJUSTE if adjustments.get(chave, False)]
+
+def substrato_observado(substrato, produto):
+    produto = np.asarray(produto, dtype=float)
+    if np.ndim(substrato) > 0:
+        return np.asarray(substrato, dtype=float)  # Série medida
+    return substrato - (produto - np.nan_to_num(produto[0]))
+
+#Diferença simulado - experimental; pontos sem medida (NaN nos dados) não contam.
+#NaN vindo da simulação continua marcando a falha da integração
+def diferenca(simulado, dados):
+    dados = np.asarray(dados, dtype=float)
+    return np.where(np.isnan(dados), 0.0, simulado - dados)
+
+#Vetor de resíduos (simulado - experimental) usado pelo least_squares
+def residuos(params, time, y0, substrate_1, substrate_2, produto_1, produto_2, adjustments, solver=None):
+    y = kinetic_model(time, params, y0, solver).y
+    obs = observacoes(adjustments, substrate_1, substrate_2, produto_1, produto_2)
+    return np.concatenate([diferenca(y[i], np.broadcast_to(dados, y[i].shape)) for i, dados in obs])
+
+#Jacobiano dos resíduos a partir das sensibilidades diretas (sem diferenças finitas)
+def jac_residuos(params, time, y0, substrate_1, substrate_2, produto_1, produto_2, adjustments, solver=None):
+    y, S = simular_sensibilidades(time, params, y0, solver)
+    obs = observacoes(adjustments, substrate_1, substrate_2, produto_1, produto_2)
+    # Linhas dos pontos sem medida ficam zeradas, como os resíduos
+    return np.vstack([S[i].T * ~np.isnan(np.broadcast_to(dados, S[i].shape[1:]))[:, None] for i, dados in obs])
+
+## Função objetivo do ajuste
+# tipo: "sse" (soma dos quadrados), "relativo" (erro dividido pelo dado), "log" (log simulado -
+# log medido) ou "huber" (quadrática até delta e linear depois, robusta a pontos aberrantes)
+# pesos: {"P1_adjust": peso, ...}; o peso pode ser um escalar ou um valor por ponto
+# delta: limiar da perda de Huber, em unidades do resíduo ponderado
+# piso: fração do maior valor medido de cada espécie usada como menor denominador/argumento
+# do log, para os pontos próximos de zero não dominarem o erro
+PERDA_PADRAO = {"tipo": "sse", "pesos": None, "delta": 0.1, "piso": 1e-3}
+PERDAS = ("sse", "relativo", "log", "huber")
+
+class ObjetivoCompilado:
+    """Função objetivo montada uma única vez por ajuste.
+
+    Espécies, máscaras dos pontos medidos, pesos e escalas são pré-calculados aqui; cada
+    avaliação só integra o modelo e faz operações vetoriais sobre uma matriz (espécie, tempo).
+    Chamada com params (6,) devolve o erro; com (6, S) (differential_evolution vectorized)
+    devolve um erro por candidato. residuos/jacobiano servem ao least_squares.
+    """
+
+    def __init__(self, time, y0, substrate_1, substrate_2, produto_1, produto_2, adjustments,
+                 solver=None, perda=None):
+        perda = PERDA_PADRAO if perda is None else {**PERDA_PADRAO, **perda}
+        if perda["tipo"] not in PERDAS:
+            raise ValueError(f"Perda desconhecida: {perda['tipo']} (use uma de {PERDAS}).")
+        obs = observacoes(adjustments, substrate_1, substrate_2, produto_1, produto_2)
+        if not obs:
+            raise ValueError("Selecione pelo menos uma espécie para o ajuste.")
+
+        self.time = np.asarray(time, dtype=float)
+        self.y0 = y0
+        self.solver = solver
+        self.tipo = perda["tipo"]
+        self.delta = float(perda["delta"])
+        self.indices = np.array([i for i, dados in obs])
+        forma = self.time.shape
+
+        dados = np.array([np.broadcast_to(np.asarray(d, dtype=float), forma) for i, d in obs])
+        medido = ~np.isnan(dados)
+        chaves = dict((i, chave) for chave, i in ESPECIES_AJUSTE)
+        pesos = perda["pesos"] or {}
+        peso = np.array([np.broadcast_to(np.asarray(pesos.get(chaves[i], 1.0), dtype=float), forma)
+                         for i in self.indices])
+        # Menor valor aceito por espécie (denominador do erro relativo e argumento do log)
+        self.piso = perda["piso"] * np.max(np.abs(np.where(medido, dados, 0.0)), axis=1)[:, None]
+        self.piso = np.where(self.piso > 0, self.piso, perda["piso"])
+
+        if self.tipo == "log":
+            medido &= np.where(medido, dados, 0.0) > 0  # log só existe para valores positivos
+        # Raiz do peso, já zerada nos pontos sem medida: resíduo = (simulado - alvo) * raiz
+        self.raiz = np.sqrt(peso) * medido
+        if self.tipo == "relativo":
+            self.raiz = self.raiz / np.maximum(np.abs(np.where(medido, dados, 0.0)), self.piso)
+        self.alvo = np.where(medido, dados, 0.0)
+        if self.tipo == "log":
+            self.alvo = np.where(medido, np.log(np.where(medido, dados, 1.0)), 0.0)
+        # least_squares aplica a mesma perda de Huber com f_scale = delta (2 * cost == erro)
+        self.perda_ls = "huber" if self.tipo == "huber" else "linear"
+
+    #Resíduos ponderados a partir das trajetórias das espécies selecionadas (..., espécie, tempo)
+    def _residuos(self, y):
+        if self.tipo == "log":
+            y = np.log(np.maximum(y, self.piso))
+        return (y - self.alvo) * self.raiz
+
+    #Soma da perda sobre espécies e tempos; NaN (integração que falhou) vira inf
+    def _erro(self, r, eixos):
+        if self.tipo == "huber":
+            a = np.abs(r)
+            termos = np.where(a <= self.delta, r ** 2, 2 * self.delta * a - self.delta ** 2)
+        else:
+            termos = r ** 2
+        return np.nan_to_num(np.sum(termos, axis=eixos), nan=np.inf)
+
+    def erro_trajetoria(self, y):
+        """Erro de uma trajetória (8, T) já integrada nos tempos do experimento."""
+        return float(self._erro(self._residuos(y[self.indices]), None))
+
+    def __call__(self, params):
+        params = np.asarray(params, dtype=float)
+        if params.ndim == 1:
+            return self.erro_trajetoria(kinetic_model(self.time, params, self.y0, self.solver).y)
+        # (6, S): trajetórias (8, S, T) reorganizadas como (S, espécie, T)
+        y = simular_lote(self.time, params.T, self.y0, self.solver)
+        return self._erro(self._residuos(y[self.indices].transpose(1, 0, 2)), (1, 2))
+
+    def residuos(self, params):
+        y = kinetic_model(self.time, params, self.y0, self.solver).y
+        return self._residuos(y[self.indices]).ravel()
+
+    def jacobiano(self, params):
+        y, S = simular_sensibilidades(self.time, params, self.y0, self.solver)
+        fator = self.raiz
+        if self.tipo == "log":
+            # d log(y)/dk = S / y; sem gradiente onde o piso foi aplicado
+            y = y[self.indices]
+            fator = np.where(y > self.piso, fator / np.maximum(y, self.piso), 0.0)
+        # S[indices]: (espécie, 6, T) -> linhas na mesma ordem de residuos
+        return (S[self.indices] * fator[:, None, :]).transpose(0, 2, 1).reshape(-1, S.shape[1])
+
+## Ajuste em duas etapas: busca global curta + refinamento local por mínimos quadrados
+# maxiter_global: gerações do differential_evolution antes do refinamento
+# tol, atol: critérios de parada antecipada do differential_evolution
+# ftol, xtol, gtol, max_nfev: critérios de parada do least_squares
+REFINAMENTO_PADRAO = {"maxiter_global": 20, "tol": 0.01, "atol": 0,
+                      "ftol": 1e-8, "xtol": 1e-8, "gtol": 1e-8, "max_nfev": 100}
+
+#Resíduos e jacobiano no espaço do otimizador (escala log: dr/dx = dr/dk * dk/dx)
+def residuos_espaco(x, espaco, funcao, jac, *args):
+    return funcao(espaco.para_constantes(x), *args)
+
+def jac_residuos_espaco(x, espaco, funcao, jac, *args):
+    return jac(espaco.para_constantes(x), *args) * espaco.derivada(x)
+
+#Refinamento local a partir de x0 com o jacobiano das sensibilidades
+# Com espaco, x0 e bounds estão no espaço do otimizador
+# Com objetivo (ObjetivoCompilado), usa os resíduos ponderados e a perda dele no lugar de args
+def refinar_local(x0, bounds, args, refinamento, espaco=None, objetivo=None):
+    lo, hi = np.array(bounds, dtype=float).T
+    funcao, jac, opcoes = residuos, jac_residuos, {}
+    if objetivo is not None:
+        funcao, jac, args = objetivo.residuos, objetivo.jacobiano, ()
+        opcoes = {"loss": objetivo.perda_ls, "f_scale": objetivo.delta}
+    if espaco is not None and not espaco.identidade:
+        funcao, jac, args = residuos_espaco, jac_residuos_espaco, (espaco, funcao, jac) + tuple(args)
+    return least_squares(funcao, np.clip(x0, lo, hi), jac=jac, bounds=(lo, hi), args=args,
+                         method="trf", ftol=refinamento["ftol"], xtol=refinamento["xtol"],
+                         gtol=refinamento["gtol"], max_nfev=refinamento["max_nfev"], **opcoes)
+
+#Objetivo, limites e população inicial da busca global (usados também por ajuste_multiplo)
+# Retorna um dicionário com espaco, bounds (constantes), limites (espaço do otimizador),
+# compilado (ObjetivoCompilado), funcao/args para o DE e init (população inicial ou None)
+def preparar_busca(time, y0, substrate_1, substrate_2, produto_1, produto_2, adjustments, popsize,
+                   seed=None, solver=None, qssa=None, espaco=None, perda=None):
+    espaco = EspacoParametros() if espaco is None else espaco
+    bounds = espaco.limites_padrao()  # Limites das constantes
+    populacao_inicial = None
+    if qssa is not None:
+        populacao_inicial = populacao_qssa(qssa, max(5, popsize * 6), bounds, seed)
+        if espaco.bounds is None:
+            bounds = limites_qssa(populacao_inicial, bounds)
+    limites = espaco.limites_otimizador(bounds)  # Limites no espaço do otimizador
+    # Montado uma vez: espécies, máscaras e pesos não são refeitos a cada avaliação
+    compilado = ObjetivoCompilado(time, y0, substrate_1, substrate_2, produto_1, produto_2, adjustments,
+                                  solver, perda)
+    funcao, args = compilado, ()
+    if not espaco.identidade:
+        # O DE avalia x; objetivo_espaco converte para as constantes antes de simular
+        funcao, args = objetivo_espaco, (espaco, compilado)
+    init = None
+    if populacao_inicial is not None:
+        lo, hi = np.array(limites).T
+        init = np.clip(espaco.para_otimizador(populacao_inicial), lo, hi)
+    return {"espaco": espaco, "bounds": bounds, "limites": limites, "compilado": compilado,
+            "funcao": funcao, "args": args, "init": init}
+
+#Refinamento local de um resultado do DE (no espaço do otimizador), aceito só se melhorar o erro
+def aplicar_refinamento(result, busca, refinamento):
+    espaco = busca["espaco"]
+    local = refinar_local(result.x, busca["limites"], (), refinamento, espaco, busca["compilado"])
+    erro_local = 2 * local.cost  # least_squares minimiza 0.5 * soma dos quadrados
+    # O refinamento não conhece a restrição dos Km; só é aceito se ela continuar valendo
+    if erro_local < result.fun and espaco.respeita(local.x):
+        result.x = local.x
+        result.fun = erro_local
+    # Contabiliza as integrações das duas etapas (cada jacobiano é uma integração aumentada)
+    result.nfev += local.nfev + local.njev
+    result.success = bool(result.success or local.success)
+    return result
+
+def calculate_kinetics(time, y0, substrate_1, substrate_2, produto_1, produto_2, adjustments,
+                       maxiter, popsize, mutation, recombination, workers=1, seed=None, solver=None,
+                       vectorized=False, refinamento=None, cache=None, callback=None, qssa=None,
+                       espaco=None, perda=None):
+    """Ajustar os parâmetros cinéticos com base nos dados experimentais.
+
+    workers: número de processos usados para avaliar cada geração (-1 usa todos os núcleos).
+    seed: semente do otimizador; com a mesma seed e o mesmo modo (serial ou paralelo) o
+    ajuste é reproduzido exatamente, independente do número de processos.
+    solver: configuração do integrador (ver SOLVER_PADRAO).
+    vectorized: integra a população de cada geração em lote (simular_lote) em vez de
+    um candidato por vez; nesse modo workers é ignorado.
+    refinamento: dicionário (ver REFINAMENTO_PADRAO) que ativa o ajuste em duas etapas;
+    None mantém apenas o differential_evolution.
+    cache: CacheSolucoes; quando informado, o DE parte da população final do último
+    ajuste dos mesmos dados e a nova população é guardada para o próximo.
+    callback: chamado a cada geração do DE com o resultado intermediário (x, fun, nit,
+    nfev, ...); retornar True interrompe o otimizador.
+    qssa: ResultadoQSSA (ver qssa_modelagem); a população inicial do DE é sorteada entre
+    constantes compatíveis com o Vmax/Km estimados e os limites são estreitados em volta dela
+    (a menos que espaco traga limites próprios).
+    espaco: EspacoParametros com a escala (linear ou log), os limites de cada constante e a
+    ordem opcional dos Km; None mantém a escala linear com limites (0.01, 10).
+    perda: dicionário (ver PERDA_PADRAO) com o tipo de erro (sse, relativo, log, huber) e os
+    pesos de cada espécie; o mesmo ObjetivoCompilado é usado pelo DE e pelo refinamento.
+    O result devolvido tem x e population_energies das constantes (x sempre em unidades de k).
+    """
+    busca = preparar_busca(time, y0, substrate_1, substrate_2, produto_1, produto_2, adjustments, popsize,
+                           seed, solver, qssa, espaco, perda)
+    espaco, bounds, limites = busca["espaco"], busca["bounds"], busca["limites"]
+
+    # Em lote a população inteira é avaliada de uma vez a cada geração
+    if vectorized:
+        workers = 1
+    updating = 'immediate' if workers == 1 and not vectorized else 'deferred'
+
+    opcoes_de = {"maxiter": maxiter, "popsize": popsize, "mutation": mutation, "recombination": recombination,
+                 "seed": seed, "workers": workers, "updating": updating, "vectorized": vectorized,
+                 "callback": callback, "constraints": espaco.restricao()}
+    if busca["init"] is not None:
+        opcoes_de["init"] = busca["init"]
+    if refinamento is not None:
+        # Busca global curta, sem o polimento do SciPy (diferenças finitas); o refinamento o substitui
+        refinamento = {**REFINAMENTO_PADRAO, **refinamento}
+        opcoes_de.update(maxiter=min(maxiter, refinamento["maxiter_global"]), tol=refinamento["tol"],
+                         atol=refinamento["atol"], polish=False)
+
+    # Reinício a partir da população de um ajuste anterior dos mesmos dados
+    if cache is not None:
+        chave = cache.chave_dados(time, y0, produto_1, produto_2, adjustments, bounds, repr(espaco), repr(perda))
+        populacao = cache.populacao(chave)
+        if populacao is not None:
+            opcoes_de["init"] = populacao
+
+    result = differential_evolution(busca["funcao"], limites, args=busca["args"], **opcoes_de)
+    populacao = getattr(result, "population", None)
+
+    if refinamento is not None:
+        result = aplicar_refinamento(result, busca, refinamento)
+
+    if cache is not None and populacao is not None:
+        # O melhor membro é trocado pelo ponto final (após polimento ou refinamento)
+        populacao[np.argmin(result.population_energies)] = result.x
+        cache.guardar_populacao(chave, populacao)
+
+    result.x = espaco.para_constantes(result.x)
+    return result
+
+# Ajuste dos parâmetros que serão usados no modelo
+def ajustar_parametros(time, E0, substrate_1, substrate_2, produto_1, produto_2, adjustments,
+                       maxiter, popsize, mutation, recombination, workers=1, seed=None, solver=None,
+                       vectorized=False, refinamento=None, cache=None, callback=None, qssa=False,
+                       espaco=None, perda=None):
+    y0 = condicoes_iniciais(E0, substrate_1, substrate_2, produto_1, produto_2) #condições iniciais
+    # Estimativa QSSA (forma integrada) para semear o DE
+    estimativa = estimar_qssa(time, E0, substrate_1, substrate_2, produto_1, produto_2) if qssa else None
+    result = calculate_kinetics(time, y0, substrate_1, substrate_2, produto_1, produto_2, adjustments,
+                                maxiter, popsize, mutation, recombination, workers, seed, solver,
+                                vectorized, refinamento, cache, callback, estimativa, espaco, perda)
+    return montar_resultado(result, time, E0, y0, produto_1, produto_2, solver, cache)
+
+#FitResult a partir do resultado do otimizador (x em unidades de k)
+def montar_resultado(result, time, E0, y0, produto_1, produto_2, solver=None, cache=None):
+    # Calcula Km e Vmax
+    k1, k_1, k2, k3, k_3, k4 = result.x
+    Km_A = (k_1 + k2) / k1 # Cálculo de Km para substrato A
+    Km_B = (k_3 + k4) / k3 # Cálculo de Km para substrato B
+    Vmax = E0 * min(k2,k4)            #Cálculo da Velocidade Máxima
+
+    # Trajetória simulada uma única vez com os parâmetros ajustados
+    sol = kinetic_model(time, result.x, y0, solver, cache)
+
+    experimental = {"Produto 1": produto_1, "Produto 2": produto_2}
+    return FitResult(k1, k_1, k2, k3, k_3, k4, Km_A, Km_B, Vmax, time, sol, result.fun, result.nfev, result.nit,
+                     experimental)
+
+## Apenas Km e Vmax pela forma integrada QSSA, sem integrar a EDO (resposta quase instantânea)
+def funcao_qssa(file_path, E0, s0_a, s0_b):
+    time, substrate_1, substrate_2, produto_1, produto_2 = read_data_from_excel(file_path, s0_a, s0_b)
+    return estimar_qssa(time, E0, substrate_1, substrate_2, produto_1, produto_2)
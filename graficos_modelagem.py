@@ -0,0 +1,237 @@
+## Gráficos dos resultados reaproveitando os mesmos artistas
+# PainelResultados cria os eixos e as linhas (Line2D) uma única vez; cada atualização só troca
+# os dados das linhas. Em um FigureCanvas com blit (interface Qt) apenas as linhas são
+# redesenhadas sobre o fundo guardado; os eixos só são redesenhados quando os limites mudam.
+# exportar_relatorios grava PNG/SVG de vários ajustes reutilizando uma única figura, e
+# exportar_em_segundo_plano faz isso em outro processo.
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from funcoes_modelagem_final import condicoes_iniciais, kinetic_model
+
+# Painéis disponíveis: título, rótulo do eixo x, rótulo do eixo y e escala do eixo y
+PAINEIS = {
+    "convergencia": ("Convergência do ajuste", "Geração", "Melhor objetivo", "log"),
+    "velocidade": ("Velocidade x Substrato", "Concentração de Substrato (mol/L)", "Velocidade (mol/L/min)", "linear"),
+    "lineweaver_burk": ("Lineweaver-Burk Plot", "1/[Substrato] (1/mol/L)", "1/Velocidade (1/(mol/L/min)", "linear"),
+    "concentracao": ("Concentração x Tempo", "Tempo (min)", "Concentração (mol/L)", "linear"),
+    "conversao": ("Conversão x Tempo", "Tempo (min)", "Conversão de Acetato de geranila (%)", "linear"),
+}
+PAINEIS_RELATORIO = ("velocidade", "lineweaver_burk", "concentracao", "conversao")  # Layout de plot_results
+PAINEIS_TELA = ("convergencia", "concentracao", "conversao", "velocidade")          # Layout da interface
+FOLGA, FOLGA_LOG = 0.15, 3.0  # Folga do eixo y ao reajustar os limites (fração da faixa; fator em escala log)
+
+# Linhas de cada painel: nome, estilo e rótulo da legenda
+LINHAS = {
+    "convergencia": [("convergencia", dict(ls='-', color='navy'), None)],
+    "velocidade": [("v_s1", dict(ls='-', color='firebrick'), 'Substrato 1'),
+                   ("v_s2", dict(ls='--', color='darkorange'), 'Substrato 2')],
+    "lineweaver_burk": [("lb_s1", dict(ls='-', marker='o', markersize=3, color='firebrick'), 'Substrato 1'),
+                        ("lb_s2", dict(ls='--', marker='o', markersize=3, color='darkorange'), 'Substrato 2')],
+    "concentracao": [("s1", dict(ls='-', color='firebrick'), 'Substrato 1'),
+                     ("s2", dict(ls='--', color='darkorange'), 'Substrato 2'),
+                     ("p1", dict(ls='-.', color='navy'), 'Produto 1'),
+                     ("p2", dict(ls=':', color='dodgerblue'), 'Produto 2'),
+                     ("p1_exp", dict(ls='', marker='o', color='navy'), 'Produto 1 (experimental)'),
+                     ("p2_exp", dict(ls='', marker='s', color='dodgerblue'), 'Produto 2 (experimental)')],
+    "conversao": [("conversao", dict(ls='-', color='seagreen'), None)],
+}
+
+#Séries de cada linha a partir de uma trajetória já calculada (8, T)
+def series_trajetoria(time, y, Km_A, Km_B, Vmax, s0_b, experimental=None):
+    S1, S2, P1, P2 = y[1], y[4], y[6], y[7]
+    v = (Vmax * S1 * S2) / (S2 * Km_A + S1 * Km_B + S1 * S2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_v, inv_s1, inv_s2 = 1 / v, 1 / S1, 1 / S2
+    series = {"v_s1": (S1, v), "v_s2": (S2, v), "lb_s1": (inv_s1, inv_v), "lb_s2": (inv_s2, inv_v),
+              "s1": (time, S1), "s2": (time, S2), "p1": (time, P1), "p2": (time, P2),
+              "conversao": (time, 100 * P2 / s0_b)}
+    if experimental is not None:
+        series["p1_exp"] = (time, experimental["Produto 1"])
+        series["p2_exp"] = (time, experimental["Produto 2"])
+    return series
+
+#Séries simuladas para outro conjunto de constantes (ajuste manual dos parâmetros)
+def series_parametros(time, k_params, E0, s0_a, s0_b, experimental=None, solver=None):
+    k1, k_1, k2, k3, k_3, k4 = k_params
+    p1_0 = p2_0 = [0.0]
+    if experimental is not None:
+        p1_0, p2_0 = experimental["Produto 1"], experimental["Produto 2"]
+    y = kinetic_model(time, k_params, condicoes_iniciais(E0, s0_a, s0_b, p1_0, p2_0), solver).y
+    return series_trajetoria(time, y, (k_1 + k2) / k1, (k_3 + k4) / k3, E0 * min(k2, k4), s0_b, experimental)
+
+def series_resultado(resultado, s0_b):
+    return series_trajetoria(resultado.time, resultado.sol.y, resultado.Km_A, resultado.Km_B, resultado.Vmax,
+                             s0_b, resultado.experimental)
+
+
+class PainelResultados:
+    """Eixos e linhas criados uma vez em uma figura existente; atualizados no lugar.
+
+    figure: figura do matplotlib (ex.: FigureCanvas.figure da interface).
+    paineis: nomes de PAINEIS, na ordem de exibição.
+    blit: redesenha só as linhas quando o canvas permite (desligado para exportar).
+    """
+
+    def __init__(self, figure, paineis=PAINEIS_RELATORIO, blit=True):
+        self.figure = figure
+        self.canvas = figure.canvas
+        self.blit = blit and getattr(self.canvas, "supports_blit", False)
+        self._fundo = None
+
+        figure.clear()
+        linhas_grade = 1 if len(paineis) <= 2 else 2
+        colunas = int(np.ceil(len(paineis) / linhas_grade))
+        self.eixos, self.linhas, self._eixo_linha = {}, {}, {}
+        for i, nome in enumerate(paineis):
+            titulo, rotulo_x, rotulo_y, escala = PAINEIS[nome]
+            ax = figure.add_subplot(linhas_grade, colunas, i + 1)
+            ax.set_yscale(escala)
+            ax.set_title(titulo, fontsize=12, weight='bold')
+            ax.set_xlabel(rotulo_x, fontsize=10, weight='bold')
+            ax.set_ylabel(rotulo_y, fontsize=10, weight='bold')
+            ax.grid()
+            for chave, estilo, rotulo in LINHAS[nome]:
+                self.linhas[chave], = ax.plot([], [], label=rotulo, animated=self.blit, **estilo)
+                self._eixo_linha[chave] = nome
+            if any(rotulo for _, _, rotulo in LINHAS[nome]):
+                ax.legend(loc='best', fontsize=8)
+            self.eixos[nome] = ax
+        figure.tight_layout()
+        self._sem_limites = set(self.eixos)  # Eixos ainda sem limites dos dados (ajuste completo)
+
+        if self.blit:
+            # Depois de cada desenho completo (inclusive redimensionamento) o fundo é guardado
+            self.canvas.mpl_connect("draw_event", self._guardar_fundo)
+
+    def _guardar_fundo(self, evento=None):
+        self._fundo = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._desenhar_linhas()
+
+    def _desenhar_linhas(self):
+        for chave, linha in self.linhas.items():
+            self.eixos[self._eixo_linha[chave]].draw_artist(linha)
+
+    #Verdadeiro se os dados cabem nos limites atuais e ocupam ao menos metade da faixa
+    @staticmethod
+    def _limites_servem(ax):
+        for (d0, d1), (v0, v1), log in ((ax.dataLim.intervalx, ax.get_xlim(), False),
+                                        (ax.dataLim.intervaly, ax.get_ylim(), ax.get_yscale() == "log")):
+            if log:
+                if min(d0, v0) <= 0:
+                    return False
+                d0, d1, v0, v1 = np.log10([d0, d1, v0, v1])
+            if d0 < v0 or d1 > v1 or (d1 - d0) < 0.5 * (v1 - v0):
+                return False
+        return True
+
+    #Ajusta os limites do eixo aos dados; verdadeiro se algum limite mudou.
+    #Os limites atuais são mantidos enquanto servem (_limites_servem): pequenas mudanças nos
+    #parâmetros não obrigam a redesenhar os eixos. Depois de reiniciar o ajuste é sempre completo
+    def _ajustar_limites(self, nome):
+        ax = self.eixos[nome]
+        ax.relim(visible_only=True)
+        if not np.all(np.isfinite(ax.dataLim.get_points())):
+            return False  # Sem dados válidos
+        if nome in self._sem_limites:
+            self._sem_limites.discard(nome)
+        elif self._limites_servem(ax):
+            return False
+        ax.autoscale_view()
+        # Folga extra no eixo y para as próximas alterações caberem sem redesenhar os eixos
+        # (auto=None: set_ylim desligaria o autoscale e o próximo autoscale_view manteria o y antigo)
+        y0, y1 = ax.get_ylim()
+        if ax.get_yscale() == "log":
+            ax.set_ylim(y0 / FOLGA_LOG, y1 * FOLGA_LOG, auto=None)
+        else:
+            ax.set_ylim(y0 - FOLGA * (y1 - y0), y1 + FOLGA * (y1 - y0), auto=None)
+        return True
+
+    def reiniciar(self):
+        """Esvazia as linhas e esquece os limites: a próxima atualização é um gráfico novo."""
+        for linha in self.linhas.values():
+            linha.set_data([], [])
+        self._sem_limites = set(self.eixos)
+
+    def atualizar(self, series, desenhar=True):
+        """series: {linha: (x, y)} (ver series_trajetoria); linhas ausentes ficam como estão."""
+        alterados = set()
+        for chave, (x, y) in series.items():
+            if chave in self.linhas:
+                self.linhas[chave].set_data(x, y)
+                alterados.add(self._eixo_linha[chave])
+        limites_mudaram = any([self._ajustar_limites(nome) for nome in alterados])
+        if desenhar:
+            self.desenhar(completo=limites_mudaram)
+
+    def atualizar_resultado(self, resultado, s0_b, desenhar=True):
+        self.atualizar(series_resultado(resultado, s0_b), desenhar)
+
+    def atualizar_convergencia(self, geracoes, melhores, desenhar=True):
+        self.atualizar({"convergencia": (geracoes, melhores)}, desenhar)
+
+    def desenhar(self, completo=False):
+        """Com blit, redesenha só as linhas sobre o fundo guardado; senão (ou se os eixos mudaram) tudo."""
+        if not self.blit or completo or self._fundo is None:
+            self.canvas.draw_idle() if self.blit else self.canvas.draw()
+            return
+        self.canvas.restore_region(self._fundo)
+        self._desenhar_linhas()
+        self.canvas.blit(self.figure.bbox)
+
+    def salvar(self, arquivo):
+        self.figure.savefig(arquivo)
+
+# Plotagem dos resultados
+def plot_results(resultado, produto_1, produto_2, substrate_2, arquivo=None):
+    """Gerar os gráficos com os resultados simulados e experimentais.
+
+    arquivo: grava a figura (PNG, SVG, ...) em vez de abrir a janela.
+    """
+    import matplotlib.pyplot as plt  # Biblioteca para plotar gráficos
+
+    # Reaproveita a trajetória já calculada no ajuste, sem resolver a EDO novamente
+    painel = PainelResultados(plt.figure(figsize=(12, 8)), blit=False)
+    experimental = {"Produto 1": produto_1, "Produto 2": produto_2}
+    painel.atualizar(series_trajetoria(resultado.time, resultado.sol.y, resultado.Km_A, resultado.Km_B,
+                                       resultado.Vmax, substrate_2, experimental))
+
+    if arquivo is None:
+        plt.show()
+    else:
+        plt.savefig(arquivo)
+        plt.close()
+
+## Exportação de relatórios
+#Dados mínimos de um FitResult para enviar a outro processo
+def dados_exportacao(resultado, s0_b, nome):
+    return {"nome": nome, "series": series_resultado(resultado, s0_b)}
+
+def exportar_relatorios(itens, pasta, formatos=("png", "svg")):
+    """Grava um arquivo por formato para cada item de dados_exportacao; uma única figura é reaproveitada."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    os.makedirs(pasta, exist_ok=True)
+    figure = Figure(figsize=(12, 8))
+    FigureCanvasAgg(figure)
+    painel = PainelResultados(figure, PAINEIS_RELATORIO, blit=False)
+    arquivos = []
+    for item in itens:
+        # Cada relatório com os limites e as linhas dos seus próprios dados, não dos anteriores
+        painel.reiniciar()
+        painel.atualizar(item["series"], desenhar=False)
+        for formato in formatos:
+            arquivo = os.path.join(pasta, f"{item['nome']}.{formato}")
+            painel.salvar(arquivo)
+            arquivos.append(arquivo)
+    return arquivos
+
+def exportar_em_segundo_plano(itens, pasta, formatos=("png", "svg")):
+    """Roda exportar_relatorios em um processo separado; devolve um Future com a lista de arquivos."""
+    pool = ProcessPoolExecutor(max_workers=1)
+    futuro = pool.submit(exportar_relatorios, list(itens), pasta, tuple(formatos))
+    pool.shutdown(wait=False)  # O processo termina sozinho quando a exportação acabar
+    return futuro
@@ -0,0 +1,180 @@
+## Incerteza dos parâmetros ajustados
+# bootstrap_residuos: reamostra os resíduos do melhor ajuste e reajusta cada amostra com
+#   mínimos quadrados partindo das constantes ajustadas (sem nova busca global).
+# perfil_verossimilhanca: fixa cada constante em uma grade e reajusta as demais.
+# Os reajustes usam MotorMinimosQuadrados com o mesmo espaco (escala e limites) e a mesma
+# perda do ajuste; passe os mesmos espaco/perda usados em funcao_final.
+# As amostras e os perfis são distribuídos em um pool de processos.
+#
+# Uso:
+#   resultado = funcao_final(..., espaco=espaco)
+#   resultado.incerteza = bootstrap_residuos(resultado, E0, s0_a, s0_b, adjustments, processos=4, espaco=espaco)
+#   print(resultado.resumo())   # inclui intervalos e matriz de correlação
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.stats import chi2
+
+from funcoes_modelagem_final import REFINAMENTO_PADRAO, ObjetivoCompilado, kinetic_model
+from espaco_parametros import EspacoParametros
+from motores_ajuste import CONSTANTES, MotorMinimosQuadrados, ProblemaAjuste
+
+NOMES = CONSTANTES + ("Km_A", "Km_B", "Vmax")
+
+
+class ResultadoIncerteza:
+    """Intervalos de confiança, matriz de correlação e dados brutos da análise."""
+
+    def __init__(self, metodo, nivel, estimativa, intervalos, correlacao=None, amostras=None, perfis=None):
+        self.metodo = metodo          # "bootstrap" ou "perfil"
+        self.nivel = nivel            # Nível de confiança (ex.: 0.95)
+        self.estimativa = estimativa  # {nome: valor do melhor ajuste}
+        self.intervalos = intervalos  # {nome: (inferior, superior)}; NaN quando não delimitado
+        self.correlacao = correlacao  # Matriz de correlação das constantes (bootstrap)
+        self.amostras = amostras      # (n, 9): k1..k4, Km_A, Km_B, Vmax de cada reamostra
+        self.perfis = perfis          # {nome: (valores, objetivo)} do perfil de verossimilhança
+
+    def resumo(self):
+        linhas = [f"Intervalos de {100 * self.nivel:.0f}% ({self.metodo}):"]
+        for nome, (inferior, superior) in self.intervalos.items():
+            linhas.append(f"{nome}: {self.estimativa[nome]:.4f} [{inferior:.4f}, {superior:.4f}]")
+        if self.correlacao is not None:
+            linhas.append("Correlação:")
+            linhas.append(" " * 6 + "".join(f"{nome:>7}" for nome in NOMES[:6]))
+            for nome, linha in zip(NOMES[:6], self.correlacao):
+                linhas.append(f"{nome:<6}" + "".join(f"{c:>7.2f}" for c in linha))
+        return "\n".join(linhas)
+
+#Constantes, Km e Vmax de um vetor de constantes (ou de uma matriz (n, 6))
+def derivados(k, E0):
+    k = np.atleast_2d(k)
+    k1, k_1, k2, k3, k_3, k4 = k.T
+    return np.column_stack([k, (k_1 + k2) / k1, (k_3 + k4) / k3, E0 * np.minimum(k2, k4)])
+
+#Problema dos reajustes a partir de um FitResult
+# O espaco perde a ordem dos Km (o least_squares não a impõe) e os limites são alargados, se
+# preciso, para conter as constantes ajustadas (ex.: limites estreitados pela estimativa QSSA)
+def problema_ajuste(resultado, E0, s0_a, s0_b, adjustments, solver=None, espaco=None, perda=None):
+    x0 = np.array(resultado.constantes, dtype=float)
+    espaco = EspacoParametros() if espaco is None else espaco
+    lo, hi = np.array(espaco.limites_padrao(), dtype=float).T
+    espaco = EspacoParametros(espaco.escala, list(zip(np.minimum(lo, x0), np.maximum(hi, x0))))
+    p1 = np.asarray(resultado.experimental["Produto 1"], dtype=float)
+    p2 = np.asarray(resultado.experimental["Produto 2"], dtype=float)
+    return ProblemaAjuste(np.asarray(resultado.time, dtype=float), E0, s0_a, s0_b, p1, p2, adjustments, solver,
+                          espaco=espaco, perda=perda)
+
+#Reajuste de uma reamostra (nível de módulo para ir ao pool)
+# ajustado: Produto 1 e Produto 2 simulados com as constantes do melhor ajuste
+def _ajustar_amostra(x0, problema, ajustado, refinamento, semente):
+    rng = np.random.default_rng(semente)
+    novos = []
+    for simulado, dados in zip(ajustado, (problema.produto_1, problema.produto_2)):
+        # Resíduos reamostrados com reposição somados à curva ajustada; pontos sem medida continuam NaN
+        r = (dados - simulado)[~np.isnan(dados)]
+        novo = simulado + rng.choice(r, size=dados.size, replace=True) if r.size else dados
+        novos.append(np.where(np.isnan(dados), np.nan, novo))
+    p = problema
+    amostra = ProblemaAjuste(p.time, p.E0, p.substrate_1, p.substrate_2, novos[0], novos[1], p.adjustments,
+                             p.solver, espaco=p.espaco, perda=p.perda)
+    return MotorMinimosQuadrados(x0, refinamento=refinamento).ajustar(amostra).constantes
+
+def bootstrap_residuos(resultado, E0, s0_a, s0_b, adjustments, n_amostras=200, nivel=0.95, processos=None,
+                       seed=None, solver=None, refinamento=None, espaco=None, perda=None):
+    """Bootstrap dos resíduos de Produto 1/Produto 2 partindo do melhor ajuste.
+
+    processos: tamanho do pool (None usa todos os núcleos; 1 roda em série).
+    espaco, perda: os mesmos do ajuste (limites e escala dos reajustes, função objetivo).
+    """
+    refinamento = {**REFINAMENTO_PADRAO, **(refinamento or {})}
+    problema = problema_ajuste(resultado, E0, s0_a, s0_b, adjustments, solver, espaco, perda)
+    x0 = np.array(resultado.constantes, dtype=float)
+    ajustado = kinetic_model(problema.time, x0, problema.condicoes_iniciais(), solver).y[[6, 7]]
+    sementes = np.random.SeedSequence(seed).spawn(n_amostras)
+
+    tarefas = ([x0] * n_amostras, [problema] * n_amostras, [ajustado] * n_amostras, [refinamento] * n_amostras,
+               sementes)
+    if processos == 1:
+        ks = list(map(_ajustar_amostra, *tarefas))
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            ks = list(pool.map(_ajustar_amostra, *tarefas, chunksize=max(1, n_amostras // 32)))
+
+    amostras = derivados(np.array(ks), E0)
+    alfa = (1 - nivel) / 2
+    inferior, superior = np.quantile(amostras, [alfa, 1 - alfa], axis=0)
+    estimativa = dict(zip(NOMES, derivados(x0, E0)[0]))
+    intervalos = {nome: (inferior[i], superior[i]) for i, nome in enumerate(NOMES)}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlacao = np.corrcoef(amostras[:, :6], rowvar=False)
+    return ResultadoIncerteza("bootstrap", nivel, estimativa, intervalos, correlacao, amostras)
+
+#Perfil de uma constante (nível de módulo para ir ao pool)
+# Cada ponto da grade reajusta as outras cinco com a constante j fixa
+def _perfil(j, x0, problema, valores, refinamento):
+    custos = np.empty(len(valores))
+    centro = int(np.argmin(np.abs(valores - x0[j])))
+    # Percorre a grade a partir do ótimo para cada lado, partindo do ponto vizinho já ajustado
+    for ordem in (range(centro, len(valores)), range(centro, -1, -1)):
+        k = x0
+        for i in ordem:
+            motor = MotorMinimosQuadrados(k, refinamento=refinamento, fixas={CONSTANTES[j]: valores[i]})
+            ajuste = motor.ajustar(problema)
+            k = np.array(ajuste.constantes)
+            custos[i] = ajuste.objetivo  # Erro da perda do ajuste (soma dos quadrados com "sse")
+    return custos
+
+#Intervalo em que o perfil fica abaixo do limiar (interpolação linear); NaN se sair da grade
+def intervalo_perfil(valores, custos, limiar):
+    abaixo = custos <= limiar
+    i_min = int(np.argmin(custos))
+    if not abaixo[i_min]:
+        # O perfil não alcança o melhor ajuste (reajustes presos em outro mínimo)
+        return (np.nan, np.nan)
+    limites = []
+    for passo in (-1, 1):
+        i = i_min
+        while 0 <= i + passo < len(valores) and abaixo[i + passo]:
+            i += passo
+        vizinho = i + passo
+        if not 0 <= vizinho < len(valores):
+            limites.append(np.nan)
+            continue
+        fracao = (limiar - custos[i]) / (custos[vizinho] - custos[i])
+        limites.append(valores[i] + fracao * (valores[vizinho] - valores[i]))
+    return tuple(limites)
+
+def perfil_verossimilhanca(resultado, E0, s0_a, s0_b, adjustments, pontos=15, fator=4.0, nivel=0.95,
+                           processos=None, solver=None, refinamento=None, espaco=None, perda=None):
+    """Perfil de verossimilhança das seis constantes (uma constante por processo).
+
+    Cada constante é fixada em `pontos` valores espaçados em escala log entre k/fator e k*fator
+    (dentro dos limites do espaco do ajuste). O intervalo é onde n*log(SQ/SQ_min) fica abaixo do
+    quantil da qui-quadrado com 1 grau de liberdade; com perdas diferentes de "sse", SQ é o erro
+    dessa perda e o intervalo é aproximado.
+    """
+    refinamento = {**REFINAMENTO_PADRAO, **(refinamento or {})}
+    problema = problema_ajuste(resultado, E0, s0_a, s0_b, adjustments, solver, espaco, perda)
+    x0 = np.array(resultado.constantes, dtype=float)
+    p = problema
+    compilado = ObjetivoCompilado(p.time, p.condicoes_iniciais(), p.substrate_1, p.substrate_2, p.produto_1,
+                                  p.produto_2, adjustments, solver, perda)
+    n = np.count_nonzero(compilado.raiz)  # Pontos medidos que entram no ajuste
+
+    limites = problema.espaco.limites_padrao()
+    grades = [np.geomspace(max(x0[j] / fator, limites[j][0]), min(x0[j] * fator, limites[j][1]), pontos)
+              for j in range(6)]
+    tarefas = (range(6), [x0] * 6, [problema] * 6, grades, [refinamento] * 6)
+    if processos == 1:
+        custos = list(map(_perfil, *tarefas))
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            custos = list(pool.map(_perfil, *tarefas))
+
+    sq_min = min(compilado(x0), *(np.min(c) for c in custos))
+    limiar = sq_min * np.exp(chi2.ppf(nivel, 1) / n)
+    estimativa = dict(zip(NOMES, derivados(x0, E0)[0]))
+    intervalos = {nome: intervalo_perfil(grades[j], custos[j], limiar) for j, nome in enumerate(NOMES[:6])}
+    perfis = {nome: (grades[j], custos[j]) for j, nome in enumerate(NOMES[:6])}
+    return ResultadoIncerteza("perfil", nivel, {nome: estimativa[nome] for nome in NOMES[:6]}, intervalos,
+                              perfis=perfis)
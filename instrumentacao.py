@@ -0,0 +1,135 @@
+## Instrumentação opcional do ajuste (tempos e contadores)
+# Quando ativa, envolve as funções do pipeline (leitura do Excel, integrações, gerações
+# do differential_evolution, refinamento e plotagem) e registra um evento por chamada.
+# Desativada, nada é envolvido: o custo é zero.
+#
+# Uso:
+#   import instrumentacao
+#   with instrumentacao.rastrear() as rastro:
+#       funcao_final(...)
+#   print(rastro.tabela())
+#   rastro.salvar_chrome("trace.json")   # abrir em chrome://tracing ou ui.perfetto.dev
+#
+# Com workers > 1 somente os eventos do processo principal são registrados.
+import functools
+import json
+import os
+import sys
+import threading
+import time as _time
+from contextlib import contextmanager
+
+# Funções envolvidas em cada módulo (só os módulos já importados são alterados)
+ALVOS = {
+    "funcoes_modelagem_final": ["read_data_from_excel", "kinetic_model", "simular_lote", "simular_sensibilidades",
+                                "differential_evolution", "least_squares"],
+    "modelagem": ["read_data_from_excel", "plot_results"],
+    "ajuste_global": ["read_data_from_excel", "kinetic_model", "simular_lote",
+                      "differential_evolution", "least_squares"],
+}
+CATEGORIAS = {"read_data_from_excel": "leitura", "kinetic_model": "integracao", "simular_lote": "integracao",
+              "simular_sensibilidades": "integracao", "differential_evolution": "otimizador",
+              "least_squares": "otimizador", "plot_results": "plotagem"}
+
+
+class Rastreador:
+    """Eventos registrados no formato do Chrome trace (fase 'X': início e duração em µs)."""
+
+    def __init__(self):
+        self.eventos = []
+        self._inicio = _time.perf_counter()
+
+    def agora_us(self):
+        return (_time.perf_counter() - self._inicio) * 1e6
+
+    def registrar(self, nome, categoria, inicio_us, fim_us, **args):
+        self.eventos.append({"name": nome, "cat": categoria, "ph": "X", "ts": inicio_us, "dur": fim_us - inicio_us,
+                             "pid": os.getpid(), "tid": threading.get_ident(), "args": args})
+
+    def salvar_chrome(self, caminho):
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump({"traceEvents": self.eventos, "displayTimeUnit": "ms"}, arquivo, default=float)
+
+    def resumo(self):
+        """Por função: chamadas, tempo total/médio/máximo (ms), nfev/njev somados e falhas."""
+        linhas = {}
+        for evento in self.eventos:
+            linha = linhas.setdefault(evento["name"], {"categoria": evento["cat"], "chamadas": 0, "total_ms": 0.0,
+                                                       "max_ms": 0.0, "nfev": 0, "njev": 0, "falhas": 0})
+            dur_ms = evento["dur"] / 1000
+            linha["chamadas"] += 1
+            linha["total_ms"] += dur_ms
+            linha["max_ms"] = max(linha["max_ms"], dur_ms)
+            linha["nfev"] += int(evento["args"].get("nfev", 0) or 0)
+            linha["njev"] += int(evento["args"].get("njev", 0) or 0)
+            linha["falhas"] += int(evento["args"].get("status", 0) not in (0, 1))
+        for linha in linhas.values():
+            linha["media_ms"] = linha["total_ms"] / linha["chamadas"]
+        return linhas
+
+    def tabela(self):
+        cabecalho = f"{'função':<26}{'categoria':<12}{'chamadas':>9}{'total ms':>11}{'média ms':>10}{'máx ms':>9}" \
+                    f"{'nfev':>9}{'njev':>7}{'falhas':>7}"
+        linhas = [cabecalho, "-" * len(cabecalho)]
+        for nome, l in sorted(self.resumo().items(), key=lambda item: -item[1]["total_ms"]):
+            linhas.append(f"{nome:<26}{l['categoria']:<12}{l['chamadas']:>9}{l['total_ms']:>11.1f}"
+                          f"{l['media_ms']:>10.3f}{l['max_ms']:>9.1f}{l['nfev']:>9}{l['njev']:>7}{l['falhas']:>7}")
+        return "\n".join(linhas)
+
+
+#Estatísticas de uma solução (solve_ivp ou integrador compilado)
+def _args_solucao(sol):
+    if not hasattr(sol, "nfev"):
+        return {}
+    return {"nfev": int(sol.nfev), "njev": int(getattr(sol, "njev", 0)), "status": int(getattr(sol, "status", 0))}
+
+
+def _envolver(funcao, nome, rastreador):
+    @functools.wraps(funcao)
+    def envolvida(*args, **kwargs):
+        if nome == "differential_evolution":
+            kwargs["callback"] = _callback_geracoes(rastreador, kwargs.get("callback"))
+        inicio = rastreador.agora_us()
+        resultado = funcao(*args, **kwargs)
+        extra = _args_solucao(resultado) if nome in ("kinetic_model", "least_squares",
+                                                     "differential_evolution") else {}
+        rastreador.registrar(nome, CATEGORIAS[nome], inicio, rastreador.agora_us(), **extra)
+        return resultado
+    return envolvida
+
+
+#Callback do DE que registra cada geração e repassa ao callback original
+def _callback_geracoes(rastreador, original):
+    estado = {"inicio": rastreador.agora_us(), "nfev": 0}
+
+    def callback(intermediate_result):
+        fim = rastreador.agora_us()
+        rastreador.registrar("geracao_de", "otimizador", estado["inicio"], fim, nit=int(intermediate_result.nit),
+                             fun=float(intermediate_result.fun), nfev=int(intermediate_result.nfev) - estado["nfev"])
+        estado["inicio"], estado["nfev"] = fim, int(intermediate_result.nfev)
+        if original is not None:
+            return original(intermediate_result)
+        return False
+    return callback
+
+
+@contextmanager
+def rastrear(rastreador=None):
+    """Ativa a instrumentação dentro do bloco e devolve o Rastreador com os eventos."""
+    rastreador = rastreador or Rastreador()
+    originais = []
+    for nome_modulo, funcoes in ALVOS.items():
+        modulo = sys.modules.get(nome_modulo)
+        if modulo is None:
+            continue
+        for nome in funcoes:
+            if hasattr(modulo, nome):
+                original = getattr(modulo, nome)
+                originais.append((modulo, nome, original))
+                setattr(modulo, nome, _envolver(original, nome, rastreador))
+    try:
+        yield rastreador
+    finally:
+        # Restaura as funções originais: fora do bloco não há custo algum
+        for modulo, nome, original in reversed(originais):
+            setattr(modulo, nome, original)
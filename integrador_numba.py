@@ -0,0 +1,165 @@
+## Integrador compilado (Numba) para o modelo ping-pong bi-bi
+# Dormand-Prince 5(4) com passo adaptativo, escrito sem chamadas Python por passo.
+# Se o Numba não estiver instalado, NUMBA_DISPONIVEL é False e o modelo usa o SciPy
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_DISPONIVEL = True
+except ImportError:
+    NUMBA_DISPONIVEL = False
+
+    def njit(*args, **kwargs):
+        # Sem o Numba as funções continuam utilizáveis (em Python puro)
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+MAX_PASSOS = 100000  # Limite de passos por integração antes de desistir
+
+# Coeficientes do método de Dormand-Prince
+C2, C3, C4, C5 = 1 / 5, 3 / 10, 4 / 5, 8 / 9
+A21 = 1 / 5
+A31, A32 = 3 / 40, 9 / 40
+A41, A42, A43 = 44 / 45, -56 / 15, 32 / 9
+A51, A52, A53, A54 = 19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729
+A61, A62, A63, A64, A65 = 9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656
+A71, A73, A74, A75, A76 = 35 / 384, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84
+# Diferença entre as soluções de 5ª e 4ª ordem (estimativa do erro local)
+E1, E3, E4, E5, E6, E7 = 71 / 57600, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40
+
+
+#Balanço de massa (mesmas equações de eq_dif) escrito em um vetor pré-alocado
+@njit(cache=True)
+def _eq_dif(y, k, dy):
+    v1 = k[0] * y[0] * y[1] - k[1] * y[2]    # E + S1 <-> ES1
+    v2 = k[2] * y[2]                         # ES1 -> E_P1 + P1
+    v3 = k[3] * y[3] * y[4] - k[4] * y[5]    # E_P1 + S2 <-> E_S2
+    v4 = k[5] * y[5]                         # E_S2 -> E + P2
+    dy[0] = -v1 + v4
+    dy[1] = -v1
+    dy[2] = v1 - v2
+    dy[3] = v2 - v3
+    dy[4] = -v3
+    dy[5] = v3 - v4
+    dy[6] = v2
+    dy[7] = v4
+
+
+@njit(cache=True)
+def _integrar(t_eval, k, y0, rtol, atol):
+    n = y0.shape[0]
+    saida = np.empty((n, t_eval.shape[0]))
+    y = y0.copy()
+    saida[:, 0] = y
+
+    k1 = np.empty(n)
+    k2 = np.empty(n)
+    k3 = np.empty(n)
+    k4 = np.empty(n)
+    k5 = np.empty(n)
+    k6 = np.empty(n)
+    k7 = np.empty(n)
+    tmp = np.empty(n)
+    y_novo = np.empty(n)
+
+    t = t_eval[0]
+    h = (t_eval[-1] - t_eval[0]) * 1e-3
+    nfev = 1
+    passos = 0
+    _eq_dif(y, k, k1)
+
+    for i in range(1, t_eval.shape[0]):
+        t_alvo = t_eval[i]
+        while t < t_alvo:
+            if passos >= MAX_PASSOS:
+                return saida, nfev, passos, False
+            # O passo é cortado para cair exatamente no próximo ponto de saída
+            ultimo = t + h >= t_alvo
+            h_passo = t_alvo - t if ultimo else h
+
+            for j in range(n):
+                tmp[j] = y[j] + h_passo * A21 * k1[j]
+            _eq_dif(tmp, k, k2)
+            for j in range(n):
+                tmp[j] = y[j] + h_passo * (A31 * k1[j] + A32 * k2[j])
+            _eq_dif(tmp, k, k3)
+            for j in range(n):
+                tmp[j] = y[j] + h_passo * (A41 * k1[j] + A42 * k2[j] + A43 * k3[j])
+            _eq_dif(tmp, k, k4)
+            for j in range(n):
+                tmp[j] = y[j] + h_passo * (A51 * k1[j] + A52 * k2[j] + A53 * k3[j] + A54 * k4[j])
+            _eq_dif(tmp, k, k5)
+            for j in range(n):
+                tmp[j] = y[j] + h_passo * (A61 * k1[j] + A62 * k2[j] + A63 * k3[j] + A64 * k4[j] + A65 * k5[j])
+            _eq_dif(tmp, k, k6)
+            for j in range(n):
+                y_novo[j] = y[j] + h_passo * (A71 * k1[j] + A73 * k3[j] + A74 * k4[j] + A75 * k5[j] + A76 * k6[j])
+            _eq_dif(y_novo, k, k7)
+            nfev += 6
+            passos += 1
+
+            # Norma RMS do erro local ponderada pelas tolerâncias
+            erro = 0.0
+            for j in range(n):
+                e = h_passo * (E1 * k1[j] + E3 * k3[j] + E4 * k4[j] + E5 * k5[j] + E6 * k6[j] + E7 * k7[j])
+                escala = atol + rtol * max(abs(y[j]), abs(y_novo[j]))
+                erro += (e / escala) ** 2
+            erro = np.sqrt(erro / n)
+
+            if erro <= 1.0:
+                t = t_alvo if ultimo else t + h_passo
+                for j in range(n):
+                    y[j] = y_novo[j]
+                    k1[j] = k7[j]  # FSAL: última derivada é a primeira do próximo passo
+                fator = 5.0 if erro == 0.0 else min(5.0, 0.9 * erro ** -0.2)
+            else:
+                fator = max(0.2, 0.9 * erro ** -0.2)
+            h = h_passo * fator
+
+        saida[:, i] = y
+
+    return saida, nfev, passos, True
+
+
+#Integra M conjuntos de parâmetros em sequência sem sair do código compilado
+@njit(cache=True)
+def _integrar_lote(t_eval, params, y0, rtol, atol):
+    M = params.shape[0]
+    saida = np.empty((y0.shape[0], M, t_eval.shape[0]))
+    sucesso = np.empty(M, dtype=np.bool_)
+    for m in range(M):
+        y, nfev, passos, ok = _integrar(t_eval, params[m], y0[:, m].copy(), rtol, atol)
+        saida[:, m, :] = y
+        sucesso[m] = ok
+    return saida, sucesso
+
+
+class SolucaoCompilada:
+    """Resultado no mesmo formato usado de solve_ivp (t, y, nfev, success)."""
+
+    def __init__(self, t, y, nfev, passos, success):
+        self.t = t
+        self.y = y
+        self.nfev = nfev
+        self.njev = 0
+        self.passos = passos
+        self.success = success
+        self.status = 0 if success else -1
+
+
+#Integra o modelo e devolve apenas as amostras em t_eval
+def integrar_compilado(t_eval, k_params, y0, rtol=1e-3, atol=1e-6):
+    t_eval = np.asarray(t_eval, dtype=np.float64)
+    k = np.asarray(k_params, dtype=np.float64)
+    y0 = np.asarray(y0, dtype=np.float64)
+    y, nfev, passos, sucesso = _integrar(t_eval, k, y0, rtol, atol)
+    return SolucaoCompilada(t_eval, y, nfev, passos, sucesso)
+
+
+#Versão em lote: params (M, 6) e y0 (8, M). Retorna y (8, M, len(t_eval)) e o sucesso de cada conjunto
+def integrar_compilado_lote(t_eval, params, y0, rtol=1e-3, atol=1e-6):
+    t_eval = np.asarray(t_eval, dtype=np.float64)
+    params = np.ascontiguousarray(params, dtype=np.float64)
+    y0 = np.ascontiguousarray(y0, dtype=np.float64)
+    return _integrar_lote(t_eval, params, y0, rtol, atol)
@@ -0,0 +1,72 @@
+## Ajuste de um arquivo de dados: leitura, banco de resultados, motor de ajuste e gráfico
+# Ponto de entrada da interface, da linha de comando e do ajuste em lote. Fica fora de
+# funcoes_modelagem_final (modelo, integrador e objetivo) e de motores_ajuste (estratégias de
+# ajuste) para que as importações sigam uma única direção:
+#   funcoes_modelagem_final <- ajuste_multiplo <- motores_ajuste <- modelagem
+# (graficos_modelagem também só importa funcoes_modelagem_final; matplotlib só ao desenhar)
+import time as _time  # Duração do ajuste
+
+from funcoes_modelagem_final import SOLVER_PADRAO, PERDA_PADRAO, read_data_from_excel
+from espaco_parametros import EspacoParametros
+from graficos_modelagem import plot_results
+from motores_ajuste import ProblemaAjuste, motor_das_opcoes
+from resultados_modelagem import BancoResultados, configuracao_ajuste
+
+## Função que irá gerar a visualização final da tela e realizará todo o calculo da modelagem
+# Essa função precisa do caminho da base de dados que o usuário irá inserir e do valor de E0
+def funcao_final(file_path, E0, s0_a, s0_b, adjustments, maxiter, popsize, mutation, recombination,
+                 workers=1, seed=None, solver=None, vectorized=False, refinamento=None, cache=None,
+                 callback=None, plot=True, qssa=False, espaco=None, perda=None, banco=None, metadados=None,
+                 multiplo=None, motor=None):
+    """motor: motor de ajuste (ver motores_ajuste) ou o nome de um deles ("trf", "de", "hibrido",
+    "multiplo"); com um nome, as opções do DE acima configuram o motor; com um objeto, elas são
+    ignoradas. None escolhe pelo que foi pedido em refinamento e multiplo.
+    multiplo: dicionário (ver ajuste_multiplo.MULTIPLO_PADRAO) que troca a busca única por várias
+    buscas com sementes diferentes, eliminando as atrasadas; workers vira o número de buscas em paralelo.
+    banco: BancoResultados (ou o caminho do arquivo); um ajuste com os mesmos dados, condições
+    iniciais e configurações é devolvido do banco sem rodar o otimizador, e os novos são guardados.
+    metadados: informações gravadas junto com o ajuste, ex. {"lote": "L-042"}.
+    """
+    if motor is None or isinstance(motor, str):
+        motor = motor_das_opcoes(motor, maxiter, popsize, mutation, recombination, workers, seed, vectorized,
+                                 refinamento, cache, multiplo)
+
+    if banco is not None:
+        banco = BancoResultados(banco) if isinstance(banco, str) else banco
+        configuracao = configuracao_ajuste(
+            adjustments=adjustments, motor=motor, solver={**SOLVER_PADRAO, **(solver or {})}, qssa=qssa,
+            espaco=espaco or EspacoParametros(), perda={**PERDA_PADRAO, **(perda or {})})
+        chave, hash_dados = banco.chave(file_path, E0, s0_a, s0_b, configuracao)
+        resultado = banco.buscar(chave)
+        if resultado is not None:
+            if plot:
+                plot_results(resultado, resultado.experimental["Produto 1"], resultado.experimental["Produto 2"], s0_b)
+            return resultado
+
+    time, substrate_1, substrate_2, produto_1, produto_2 = read_data_from_excel(file_path, s0_a, s0_b)
+
+    # Histórico de convergência; um ajuste interrompido pelo callback não é guardado no banco
+    historico, interrompido = [], []
+    def registrar(intermediate_result):
+        historico.append(float(intermediate_result.fun))
+        if callback is not None and callback(intermediate_result):
+            interrompido.append(True)
+            return True
+        return False
+
+    # Encontrando as constantes necessárias (uma única otimização por execução)
+    problema = ProblemaAjuste(time, E0, substrate_1, substrate_2, produto_1, produto_2, adjustments, solver,
+                              qssa, espaco, perda)
+    inicio = _time.perf_counter()
+    resultado = motor.ajustar(problema, registrar)
+    if resultado.historico is None:  # ajuste_multiplo devolve o histórico da busca líder
+        resultado.historico = historico
+    resultado.segundos = _time.perf_counter() - inicio
+
+    if banco is not None and not interrompido:
+        banco.guardar(chave, hash_dados, file_path, E0, s0_a, s0_b, configuracao, resultado, metadados)
+
+    if plot:
+        plot_results(resultado, produto_1, produto_2, substrate_2)
+
+    return resultado
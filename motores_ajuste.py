@@ -0,0 +1,244 @@
+## Motores de ajuste: uma interface para mínimos quadrados (TRF), DE, híbrido e vários inícios
+# Todos recebem o mesmo ProblemaAjuste e usam a mesma camada de modelo de funcoes_modelagem_final
+# (ObjetivoCompilado, jacobiano das sensibilidades, escolha do integrador, integrador compilado e
+# cache de soluções), então uma melhoria nessa camada vale para qualquer motor.
+# O refinar() do ajuste incremental e o bootstrap/perfil de incerteza rodam MotorMinimosQuadrados.
+# O ajuste global (um vetor para vários experimentos) e a correção do filtro de Kalman do ajuste
+# incremental não são motores, mas usam o mesmo ObjetivoCompilado, espaco e perda.
+# O antigo funcoes_modelagem_3 (curve_fit com k_1 = k1 e k_3 = k3) corresponde a
+# MotorMinimosQuadrados(vinculos=VINCULOS_LEGADO).
+#
+# Uso:
+#   resultado = modelagem.funcao_final(..., motor="trf")                     # por nome (ver MOTORES)
+#   resultado = modelagem.funcao_final(..., motor=MotorHibrido(200, 15, refinamento={"max_nfev": 50}))
+#   resultado = MotorDE(300, 15).ajustar(ProblemaAjuste(time, E0, s1, s2, p1, p2, adjustments))
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from funcoes_modelagem_final import (
+    REFINAMENTO_PADRAO, condicoes_iniciais, ajustar_parametros, preparar_busca, refinar_local, montar_resultado,
+)
+from ajuste_multiplo import MULTIPLO_PADRAO, ajustar_multiplos
+from qssa_modelagem import estimar_qssa
+
+CONSTANTES = ("k1", "k_1", "k2", "k3", "k_3", "k4")
+P0_PADRAO = (0.1,) * 6  # Chute inicial do curve_fit do módulo antigo
+VINCULOS_LEGADO = {"k_1": "k1", "k_3": "k3"}
+
+
+class ProblemaAjuste:
+    """Dados de um experimento e configuração do modelo, comuns a todos os motores."""
+
+    def __init__(self, time, E0, substrate_1, substrate_2, produto_1, produto_2, adjustments, solver=None,
+                 qssa=False, espaco=None, perda=None):
+        self.time = time
+        self.E0 = E0
+        self.substrate_1 = substrate_1
+        self.substrate_2 = substrate_2
+        self.produto_1 = produto_1
+        self.produto_2 = produto_2
+        self.adjustments = adjustments
+        self.solver = solver
+        self.qssa = qssa
+        self.espaco = espaco
+        self.perda = perda
+
+    @property
+    def dados(self):
+        return (self.time, self.E0, self.substrate_1, self.substrate_2, self.produto_1, self.produto_2,
+                self.adjustments)
+
+    def condicoes_iniciais(self):
+        return condicoes_iniciais(self.E0, self.substrate_1, self.substrate_2, self.produto_1, self.produto_2)
+
+
+class MotorAjuste:
+    """Interface: ajustar(problema, callback) devolve um FitResult.
+
+    callback recebe um resultado intermediário (x, fun, nit, nfev); retornar True interrompe o
+    ajuste quando o motor permite.
+    """
+
+    nome = None
+
+    def ajustar(self, problema, callback=None):
+        raise NotImplementedError
+
+    def __repr__(self):
+        # Também é a configuração gravada no banco de resultados (o cache não muda o resultado)
+        opcoes = {chave: valor for chave, valor in vars(self).items() if chave != "cache"}
+        return f"{type(self).__name__}({opcoes!r})"
+
+
+class MotorDE(MotorAjuste):
+    """differential_evolution com polimento do SciPy (ver calculate_kinetics)."""
+
+    nome = "de"
+
+    def __init__(self, maxiter=1000, popsize=15, mutation=(0.5, 1), recombination=0.7, workers=1, seed=None,
+                 vectorized=False, refinamento=None, cache=None):
+        self.maxiter = maxiter
+        self.popsize = popsize
+        self.mutation = mutation
+        self.recombination = recombination
+        self.workers = workers
+        self.seed = seed
+        self.vectorized = vectorized
+        self.refinamento = None if refinamento is None else {**REFINAMENTO_PADRAO, **refinamento}
+        self.cache = cache
+
+    def ajustar(self, problema, callback=None):
+        p = problema
+        return ajustar_parametros(*p.dados, self.maxiter, self.popsize, self.mutation, self.recombination,
+                                  self.workers, self.seed, p.solver, self.vectorized, self.refinamento,
+                                  self.cache, callback, p.qssa, p.espaco, p.perda)
+
+
+class MotorHibrido(MotorDE):
+    """DE curto seguido de mínimos quadrados com o jacobiano das sensibilidades."""
+
+    nome = "hibrido"
+
+    def __init__(self, maxiter=1000, popsize=15, mutation=(0.5, 1), recombination=0.7, workers=1, seed=None,
+                 vectorized=False, refinamento=None, cache=None):
+        super().__init__(maxiter, popsize, mutation, recombination, workers, seed, vectorized,
+                         refinamento or {}, cache)
+
+
+class MotorMultiplo(MotorDE):
+    """Várias buscas do DE com reinícios e eliminação das atrasadas (ver ajuste_multiplo).
+
+    workers é o número de buscas avançadas em paralelo; o cache de populações não é usado.
+    """
+
+    nome = "multiplo"
+
+    def __init__(self, maxiter=1000, popsize=15, mutation=(0.5, 1), recombination=0.7, workers=1, seed=None,
+                 vectorized=False, refinamento=None, cache=None, multiplo=None):
+        super().__init__(maxiter, popsize, mutation, recombination, workers, seed, vectorized, refinamento, cache)
+        self.multiplo = {**MULTIPLO_PADRAO, **(multiplo or {})}
+
+    def ajustar(self, problema, callback=None):
+        p = problema
+        return ajustar_multiplos(*p.dados, self.maxiter, self.popsize, self.mutation, self.recombination,
+                                 self.multiplo, self.workers, self.seed, p.solver, self.vectorized,
+                                 self.refinamento, callback, p.qssa, p.espaco, p.perda)
+
+
+class ObjetivoVinculado:
+    """ObjetivoCompilado visto só pelas constantes livres.
+
+    fonte: para cada uma das seis constantes, a posição da livre que ela copia.
+    fixas: valor de cada constante mantida fixa (NaN nas demais); a fonte delas é ignorada.
+    """
+
+    def __init__(self, compilado, fonte, fixas=None):
+        self.compilado = compilado
+        self.fonte = np.asarray(fonte)
+        self.fixas = np.full(len(self.fonte), np.nan) if fixas is None else np.asarray(fixas, dtype=float)
+        self.fixa = ~np.isnan(self.fixas)
+        # dk/dk_livre: cada constante depende de no máximo uma livre (nenhuma se for fixa)
+        self.mapa = np.eye(self.fonte.max() + 1)[self.fonte] * ~self.fixa[:, None]
+        self.perda_ls = compilado.perda_ls
+        self.delta = compilado.delta
+
+    def constantes(self, params):
+        return np.where(self.fixa, self.fixas, np.asarray(params)[self.fonte])
+
+    def residuos(self, params):
+        return self.compilado.residuos(self.constantes(params))
+
+    def jacobiano(self, params):
+        return self.compilado.jacobiano(self.constantes(params)) @ self.mapa
+
+
+class MotorMinimosQuadrados(MotorAjuste):
+    """Mínimos quadrados locais (TRF, o método do curve_fit com limites) a partir de um chute inicial.
+
+    p0: constantes iniciais; None usa a melhor amostra da estimativa QSSA (com problema.qssa)
+    ou P0_PADRAO. vinculos: {"k_1": "k1"} faz k_1 acompanhar k1 em vez de ser ajustada.
+    fixas: {"k2": 0.8} mantém k2 nesse valor (perfil de verossimilhança).
+    refinamento: critérios de parada do least_squares (ftol, xtol, gtol, max_nfev de
+    REFINAMENTO_PADRAO). O least_squares não aceita a restrição de ordem dos Km: um problema
+    com espaco.ordem_km levanta ValueError.
+    """
+
+    nome = "trf"
+
+    def __init__(self, p0=None, vinculos=None, refinamento=None, seed=None, cache=None, fixas=None):
+        vinculos, fixas = dict(vinculos or {}), {nome: float(k) for nome, k in (fixas or {}).items()}
+        for constante, alvo in vinculos.items():
+            if constante not in CONSTANTES or alvo not in CONSTANTES or alvo in vinculos or alvo in fixas:
+                raise ValueError(f"Vínculo inválido: {constante} = {alvo} (use constantes livres de {', '.join(CONSTANTES)}).")
+        for constante, valor in fixas.items():
+            if constante not in CONSTANTES or constante in vinculos or not valor > 0:
+                raise ValueError(f"Constante fixa inválida: {constante} = {valor} (use uma constante livre e um valor positivo).")
+        if len(vinculos) + len(fixas) >= len(CONSTANTES):
+            raise ValueError("Deixe pelo menos uma constante livre para o ajuste.")
+        self.p0 = None if p0 is None else tuple(float(k) for k in p0)
+        self.vinculos = vinculos
+        self.fixas = fixas
+        self.refinamento = {**REFINAMENTO_PADRAO, **(refinamento or {})}
+        self.seed = seed
+        self.cache = cache
+
+    def _inicio(self, busca):
+        espaco, lo_hi = busca["espaco"], np.array(busca["limites"]).T
+        if self.p0 is not None:
+            x0 = espaco.para_otimizador(self.p0)
+        elif busca["init"] is not None:
+            # A melhor das amostras QSSA, avaliadas de uma vez (colunas = candidatos)
+            energias = busca["compilado"](espaco.para_constantes(busca["init"].T))
+            x0 = busca["init"][np.argmin(energias)]
+        else:
+            x0 = espaco.para_otimizador(P0_PADRAO)
+        return np.clip(x0, *lo_hi)
+
+    def ajustar(self, problema, callback=None):
+        p = problema
+        if p.espaco is not None and p.espaco.ordem_km is not None:
+            raise ValueError("O motor de mínimos quadrados não impõe a ordem dos Km; "
+                             "use um motor com DE (de, hibrido, multiplo) ou um espaco sem ordem_km.")
+        y0 = p.condicoes_iniciais()
+        estimativa = estimar_qssa(*p.dados[:6]) if p.qssa else None
+        busca = preparar_busca(p.time, y0, p.substrate_1, p.substrate_2, p.produto_1, p.produto_2, p.adjustments,
+                               1, self.seed, p.solver, estimativa, p.espaco, p.perda)
+        espaco, objetivo = busca["espaco"], busca["compilado"]
+
+        livres = [i for i, nome in enumerate(CONSTANTES) if nome not in self.vinculos and nome not in self.fixas]
+        fonte = [livres.index(CONSTANTES.index(self.vinculos.get(nome, nome))) if nome not in self.fixas else 0
+                 for nome in CONSTANTES]
+        fixas = [self.fixas.get(nome, np.nan) for nome in CONSTANTES]
+        if self.vinculos or self.fixas:
+            objetivo = ObjetivoVinculado(objetivo, fonte, fixas)
+
+        x0 = self._inicio(busca)[livres]
+        limites = [busca["limites"][i] for i in livres]
+        local = refinar_local(x0, limites, (), self.refinamento, espaco, objetivo)
+
+        constantes = np.where(np.isnan(fixas), espaco.para_constantes(local.x)[fonte], fixas)
+        result = OptimizeResult(x=constantes, fun=2 * local.cost,
+                                nfev=local.nfev + local.njev, nit=local.nfev, success=local.success)
+        # least_squares não tem callback por iteração: o resultado final é informado uma vez
+        if callback is not None:
+            callback(result)
+        return montar_resultado(result, p.time, p.E0, y0, p.produto_1, p.produto_2, p.solver, self.cache)
+
+
+MOTORES = {"trf": MotorMinimosQuadrados, "de": MotorDE, "hibrido": MotorHibrido, "multiplo": MotorMultiplo}
+
+#Motor a partir do nome e das opções do DE usadas por funcao_final
+# nome None escolhe pelo que foi pedido: multiplo -> "multiplo", refinamento -> "hibrido", senão "de"
+def motor_das_opcoes(nome, maxiter, popsize, mutation, recombination, workers=1, seed=None, vectorized=False,
+                     refinamento=None, cache=None, multiplo=None):
+    if nome is None:
+        nome = "multiplo" if multiplo is not None else "de" if refinamento is None else "hibrido"
+    if nome not in MOTORES:
+        raise ValueError(f"Motor inválido: {nome} (use {', '.join(MOTORES)}).")
+    if nome == "trf":
+        return MotorMinimosQuadrados(refinamento=refinamento, seed=seed, cache=cache)
+    if nome == "de":
+        refinamento = None
+    opcoes = {"multiplo": multiplo} if nome == "multiplo" else {}
+    return MOTORES[nome](maxiter, popsize, mutation, recombination, workers, seed, vectorized, refinamento, cache,
+                         **opcoes)
@@ -0,0 +1,93 @@
+## Ajuste rápido pela aproximação do estado pseudo-estacionário (QSSA)
+# Com a lei de velocidade ping-pong bi-bi (ver modelo em funcoes_modelagem_final)
+#   1/v = 1/Vmax + Km_A/(Vmax A) + Km_B/(Vmax B),   A = s0_a - x,  B = s0_b - x
+# a forma integrada dá o tempo para atingir o avanço x (produto formado) em forma fechada:
+#   t = x/Vmax - (Km_A/Vmax) ln(1 - x/s0_a) - (Km_B/Vmax) ln(1 - x/s0_b)
+# que é linear em (1/Vmax, Km_A/Vmax, Km_B/Vmax): um único mínimos quadrados não negativo,
+# sem integrar a EDO de 8 estados.
+# As estimativas servem para semear os limites e a população inicial do differential_evolution.
+import numpy as np
+from scipy.optimize import nnls
+
+
+class ResultadoQSSA:
+    """Vmax, Km_A e Km_B da forma integrada e o kcat correspondente."""
+
+    def __init__(self, Vmax, Km_A, Km_B, E0, residuo, n_pontos):
+        self.Vmax = Vmax
+        self.Km_A = Km_A
+        self.Km_B = Km_B
+        self.kcat = Vmax / E0        # Vmax = E0 * k2 k4 / (k2 + k4) no mecanismo
+        self.residuo = residuo       # Norma dos resíduos em tempo da regressão
+        self.n_pontos = n_pontos
+
+    def resumo(self):
+        return (f"QSSA\nVmax: {self.Vmax:.4f}\nKm_A: {self.Km_A:.4f}\nKm_B: {self.Km_B:.4f}\n"
+                f"kcat: {self.kcat:.4f}\nPontos: {self.n_pontos}")
+
+#Matriz da forma integrada para os avanços x
+def matriz_integrada(x, s0_a, s0_b):
+    return np.column_stack([x, -np.log1p(-x / s0_a), -np.log1p(-x / s0_b)])
+
+def estimar_qssa(time, E0, s0_a, s0_b, produto_1, produto_2, limite_conversao=0.98):
+    """Vmax, Km_A e Km_B pela forma integrada, usando Produto 1 e Produto 2.
+
+    O avanço de cada produto é medido a partir do seu valor inicial. Pontos sem medida e
+    pontos acima de limite_conversao do substrato limitante (logaritmo mal condicionado)
+    são descartados.
+    """
+    time = np.asarray(time, dtype=float)
+    t, x = [], []
+    for produto in (produto_1, produto_2):
+        produto = np.asarray(produto, dtype=float)
+        avanco = produto - np.nan_to_num(produto[0])
+        valido = (~np.isnan(avanco) & (avanco > 0) & (time > time[0])
+                  & (avanco < limite_conversao * min(s0_a, s0_b)))
+        t.append(time[valido] - time[0])
+        x.append(avanco[valido])
+    t, x = np.concatenate(t), np.concatenate(x)
+    if t.size < 3:
+        raise ValueError("Dados insuficientes para o ajuste QSSA (são necessários ao menos 3 pontos com produto).")
+
+    c, residuo = nnls(matriz_integrada(x, s0_a, s0_b), t)
+    if c[0] <= 0:
+        raise ValueError("Ajuste QSSA sem solução física (1/Vmax nulo).")
+    Vmax = 1 / c[0]
+    return ResultadoQSSA(Vmax, c[1] * Vmax, c[2] * Vmax, E0, residuo, t.size)
+
+#Conjuntos de constantes compatíveis com Vmax, Km_A e Km_B estimados
+def populacao_qssa(estimativa, n, bounds, seed=None):
+    """Amostra n conjuntos (k1, k_1, k2, k3, k_3, k4) do mecanismo com os mesmos Vmax/Km.
+
+    No mecanismo ping-pong: kcat = k2 k4/(k2 + k4), Km_A = k4 (k_1 + k2)/(k1 (k2 + k4)) e
+    Km_B = k2 (k_3 + k4)/(k3 (k2 + k4)). k2 e as constantes reversas são sorteados em escala
+    log e as demais calculadas; os valores são limitados a bounds. Um Km estimado como zero
+    deixa k1 (ou k3) livre.
+    """
+    rng = np.random.default_rng(seed)
+    lo, hi = np.array(bounds, dtype=float).T
+    kcat = estimativa.kcat
+    log_uniforme = lambda a, b: np.exp(rng.uniform(np.log(a), np.log(b), n))
+
+    k2 = log_uniforme(max(1.05 * kcat, lo[2]), max(20 * kcat, 1.1 * lo[2]))
+    k4 = kcat * k2 / np.maximum(k2 - kcat, 1e-12)
+    k_1 = log_uniforme(lo[1], hi[1])
+    k_3 = log_uniforme(lo[4], hi[4])
+    # Km nulo (restrição ativa no nnls) não informa nada sobre k1/k3: sorteados em toda a faixa
+    if estimativa.Km_A > 0:
+        k1 = k4 * (k_1 + k2) / (estimativa.Km_A * (k2 + k4))
+    else:
+        k1 = log_uniforme(lo[0], hi[0])
+    if estimativa.Km_B > 0:
+        k3 = k2 * (k_3 + k4) / (estimativa.Km_B * (k2 + k4))
+    else:
+        k3 = log_uniforme(lo[3], hi[3])
+    return np.clip(np.column_stack([k1, k_1, k2, k3, k_3, k4]), lo, hi)
+
+#Limites de cada constante a partir da população semeada, com folga multiplicativa
+# (larga: a QSSA é aproximada quando E0 não é muito menor que os substratos)
+def limites_qssa(populacao, bounds, folga=10.0):
+    lo, hi = np.array(bounds, dtype=float).T
+    inferior = np.maximum(populacao.min(axis=0) / folga, lo)
+    superior = np.minimum(populacao.max(axis=0) * folga, hi)
+    return list(zip(inferior, superior))
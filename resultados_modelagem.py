@@ -0,0 +1,185 @@
+## Banco local de resultados dos ajustes (SQLite)
+# Cada ajuste é identificado pelo hash do arquivo de dados, pelas condições iniciais (E0, s0_a,
+# s0_b) e pelas configurações da função objetivo e do otimizador; funcao_final(banco=...) devolve
+# o ajuste guardado quando tudo coincide, sem rodar o otimizador de novo.
+# Constantes, Km, Vmax, tempo de execução e o lote da enzima ficam em colunas (com índices) para
+# consultas rápidas sobre milhares de ajustes; trajetória, dados e histórico de convergência ficam
+# em uma tabela separada, lida só quando o ajuste é recuperado.
+# Uso:
+#   banco = BancoResultados()
+#   resultado = funcao_final(..., banco=banco, metadados={"lote": "L-042"})
+#   banco.distribuicao("Km_A", por="lote")   -> {"L-042": array([...]), ...}
+import json
+import os
+import sqlite3
+import time as _time
+from contextlib import contextmanager
+
+import numpy as np
+
+from cache_modelagem import chave_hash, arredondar
+from dados_modelagem import hash_arquivo
+from funcoes_modelagem_final import FitResult
+from integrador_numba import SolucaoCompilada
+
+BANCO_PADRAO = os.path.join(os.path.expanduser("~"), ".cache", "modelagem_enzimatica", "resultados.sqlite")
+
+# Colunas numéricas de cada ajuste, na ordem da tabela
+COLUNAS_AJUSTE = ("k1", "k_1", "k2", "k3", "k_3", "k4", "Km_A", "Km_B", "Vmax", "objetivo", "nfev", "nit",
+                  "segundos")
+# Colunas que podem ser lidas e filtradas em consultar/distribuicao
+COLUNAS_CONSULTA = ("chave", "hash_dados", "arquivo", "E0", "s0_a", "s0_b", "lote", "criado") + COLUNAS_AJUSTE
+
+ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS ajustes (
+    chave TEXT PRIMARY KEY, hash_dados TEXT NOT NULL, arquivo TEXT, E0 REAL, s0_a REAL, s0_b REAL,
+    lote TEXT, metadados TEXT, configuracao TEXT, {", ".join(c + " REAL" for c in COLUNAS_AJUSTE)}, criado REAL
+);
+CREATE INDEX IF NOT EXISTS ajustes_dados ON ajustes (hash_dados);
+CREATE INDEX IF NOT EXISTS ajustes_lote ON ajustes (lote, Km_A);
+CREATE TABLE IF NOT EXISTS trajetorias (
+    chave TEXT PRIMARY KEY, time BLOB, y BLOB, experimental BLOB, historico BLOB
+);
+"""
+
+#Texto canônico das configurações do ajuste (entra na chave e fica guardado com o resultado)
+def configuracao_ajuste(**opcoes):
+    return json.dumps(opcoes, sort_keys=True, default=repr)
+
+def _blob(valores):
+    return np.ascontiguousarray(valores, dtype=float).tobytes()
+
+def _array(blob):
+    return np.frombuffer(blob, dtype=float).copy()
+
+
+class BancoResultados:
+    """Resultados de ajustes guardados em um arquivo SQLite.
+
+    Uma conexão é aberta a cada operação, então o mesmo objeto pode ser usado pela thread
+    da interface e enviado aos processos do pool (que gravam no mesmo arquivo).
+    """
+
+    def __init__(self, caminho=BANCO_PADRAO):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with self._conectar() as conexao:
+            conexao.execute("PRAGMA journal_mode=WAL")  # Leituras não esperam as gravações
+            conexao.executescript(ESQUEMA)
+
+    def __repr__(self):
+        return f"BancoResultados({self.caminho!r})"
+
+    def __len__(self):
+        with self._conectar() as conexao:
+            return conexao.execute("SELECT COUNT(*) FROM ajustes").fetchone()[0]
+
+    #Conexão de uma operação: confirma (ou desfaz) a transação e sempre fecha o arquivo
+    @contextmanager
+    def _conectar(self):
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def chave(self, file_path, E0, s0_a, s0_b, configuracao):
+        """Chave do ajuste e hash do arquivo de dados."""
+        hash_dados = hash_arquivo(file_path)
+        return chave_hash(hash_dados, arredondar([E0, s0_a, s0_b]), configuracao), hash_dados
+
+    def guardar(self, chave, hash_dados, file_path, E0, s0_a, s0_b, configuracao, resultado, metadados=None):
+        metadados = dict(metadados or {})
+        experimental = resultado.experimental or {}
+        valores = [float(getattr(resultado, c)) if getattr(resultado, c) is not None else None
+                   for c in COLUNAS_AJUSTE]
+        linha = [chave, hash_dados, os.path.abspath(file_path), float(E0), float(s0_a), float(s0_b),
+                 metadados.get("lote"), json.dumps(metadados, default=repr), configuracao] + valores + [_time.time()]
+        with self._conectar() as conexao:
+            conexao.execute(f"INSERT OR REPLACE INTO ajustes VALUES ({', '.join('?' * len(linha))})", linha)
+            conexao.execute("INSERT OR REPLACE INTO trajetorias VALUES (?, ?, ?, ?, ?)",
+                            (chave, _blob(resultado.time), _blob(resultado.sol.y),
+                             _blob([experimental.get("Produto 1", []), experimental.get("Produto 2", [])]),
+                             _blob(resultado.historico or [])))
+
+    def buscar(self, chave):
+        """FitResult guardado com essa chave, ou None."""
+        with self._conectar() as conexao:
+            linha = conexao.execute(f"SELECT {', '.join(COLUNAS_AJUSTE)} FROM ajustes WHERE chave = ?",
+                                    (chave,)).fetchone()
+            blobs = conexao.execute("SELECT time, y, experimental, historico FROM trajetorias WHERE chave = ?",
+                                    (chave,)).fetchone()
+        if linha is None or blobs is None:
+            return None
+
+        valores = dict(zip(COLUNAS_AJUSTE, linha))
+        time = _array(blobs[0])
+        experimental = _array(blobs[2]).reshape(2, -1)
+        resultado = FitResult(*(valores[c] for c in ("k1", "k_1", "k2", "k3", "k_3", "k4", "Km_A", "Km_B", "Vmax")),
+                              time, SolucaoCompilada(time, _array(blobs[1]).reshape(8, -1), 0, 0, True),
+                              valores["objetivo"], int(valores["nfev"]), int(valores["nit"]),
+                              {"Produto 1": experimental[0], "Produto 2": experimental[1]})
+        resultado.historico = list(_array(blobs[3]))
+        resultado.segundos = valores["segundos"]
+        resultado.recuperado = True
+        return resultado
+
+    def remover(self, chave):
+        with self._conectar() as conexao:
+            conexao.execute("DELETE FROM ajustes WHERE chave = ?", (chave,))
+            conexao.execute("DELETE FROM trajetorias WHERE chave = ?", (chave,))
+
+    ## Consultas
+    #Condição WHERE a partir dos filtros: valor exato, lista de valores ou intervalo (mínimo, máximo)
+    @staticmethod
+    def _onde(filtros):
+        condicoes, valores = [], []
+        for coluna, valor in filtros.items():
+            _validar_coluna(coluna)
+            if isinstance(valor, tuple):
+                condicoes.append(f"{coluna} BETWEEN ? AND ?")
+                valores.extend(valor)
+            elif isinstance(valor, list):
+                condicoes.append(f"{coluna} IN ({', '.join('?' * len(valor))})")
+                valores.extend(valor)
+            else:
+                condicoes.append(f"{coluna} = ?")
+                valores.append(valor)
+        return (" WHERE " + " AND ".join(condicoes) if condicoes else ""), valores
+
+    def consultar(self, colunas=None, ordem=None, limite=None, **filtros):
+        """Colunas dos ajustes que atendem os filtros, como {coluna: array}.
+
+        Ex.: consultar(["lote", "Km_A"], lote=["L1", "L2"], E0=(0.05, 0.2)).
+        """
+        colunas = list(colunas or COLUNAS_CONSULTA)
+        for coluna in colunas + ([ordem] if ordem else []):
+            _validar_coluna(coluna)
+        onde, valores = self._onde(filtros)
+        sql = f"SELECT {', '.join(colunas)} FROM ajustes{onde}"
+        if ordem:
+            sql += f" ORDER BY {ordem}"
+        if limite:
+            sql += f" LIMIT {int(limite)}"
+        with self._conectar() as conexao:
+            linhas = conexao.execute(sql, valores).fetchall()
+        return {coluna: np.array([linha[i] for linha in linhas]) for i, coluna in enumerate(colunas)}
+
+    def distribuicao(self, coluna="Km_A", por="lote", **filtros):
+        """Valores de uma coluna agrupados por outra: {grupo: array}."""
+        _validar_coluna(coluna)
+        _validar_coluna(por)
+        onde, valores = self._onde(filtros)
+        with self._conectar() as conexao:
+            linhas = conexao.execute(f"SELECT {por}, {coluna} FROM ajustes{onde} ORDER BY {por}", valores).fetchall()
+        grupos = {}
+        for grupo, valor in linhas:
+            grupos.setdefault(grupo, []).append(valor)
+        return {grupo: np.array(lista, dtype=float) for grupo, lista in grupos.items()}
+
+
+#Só nomes conhecidos entram no texto do SQL
+def _validar_coluna(coluna):
+    if coluna not in COLUNAS_CONSULTA:
+        raise ValueError(f"Coluna desconhecida: {coluna} (use uma de {COLUNAS_CONSULTA}).")
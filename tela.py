@@ -1,28 +1,60 @@
 import sys
 import os
+import time
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QVBoxLayout, QPushButton, QWidget,
-    QLabel, QLineEdit, QMessageBox, QStackedWidget, QHBoxLayout, QGroupBox, QFrame, QTextEdit
+    QLabel, QLineEdit, QMessageBox, QStackedWidget, QHBoxLayout, QGroupBox, QFrame, QTextEdit, QCheckBox,
+    QComboBox
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QPixmap, QIcon
-import importlib.util
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import (
     FigureCanvasQTAgg as FigureCanvas
 )
 
-# Importa as funções necessárias dos arquivos fornecidos
-simulacao_path = "funcao_simulacao_2.py"
-modelagem_path = "funcoes_modelagem_3.py"
-
-spec_sim = importlib.util.spec_from_file_location("funcoes_simulacao", simulacao_path)
-funcoes_simulacao = importlib.util.module_from_spec(spec_sim)
-spec_sim.loader.exec_module(funcoes_simulacao)
-
-spec_mod = importlib.util.spec_from_file_location("funcoes_modelagem", modelagem_path)
-funcoes_modelagem = importlib.util.module_from_spec(spec_mod)
-spec_mod.loader.exec_module(funcoes_modelagem)
+# Importa as funções de simulação pelo nome (funciona a partir de qualquer diretório)
+import funcao_simulacao_2 as funcoes_simulacao
+
+# A modelagem é importada pelo nome para que as funções do ajuste possam ser
+# enviadas a outros processos (differential_evolution com workers > 1)
+import funcoes_modelagem_final as funcoes_modelagem
+import modelagem
+from graficos_modelagem import PainelResultados, PAINEIS_TELA, series_parametros
+from resultados_modelagem import BancoResultados
+
+
+class ModelagemWorker(QThread):
+    """Executa o ajuste fora da thread da interface e informa o progresso por geração."""
+    progresso = pyqtSignal(int, float, float)  # geração, melhor objetivo, avaliações/s
+    concluido = pyqtSignal(object)             # FitResult
+    falhou = pyqtSignal(str)
+
+    def __init__(self, argumentos, parent=None):
+        super().__init__(parent)
+        self.argumentos = argumentos
+        self.cancelado = False
+        self._cancelar = False
+
+    def cancelar(self):
+        self._cancelar = True
+
+    def _callback(self, intermediate_result):
+        decorrido = time.perf_counter() - self._inicio
+        taxa = intermediate_result.nfev / decorrido if decorrido > 0 else 0.0
+        self.progresso.emit(int(intermediate_result.nit), float(intermediate_result.fun), taxa)
+        if self._cancelar:
+            self.cancelado = True
+            return True  # Interrompe o differential_evolution ao fim da geração
+        return False
+
+    def run(self):
+        self._inicio = time.perf_counter()
+        try:
+            resultado = modelagem.funcao_final(**self.argumentos, callback=self._callback, plot=False)
+            self.concluido.emit(resultado)
+        except Exception as e:
+            self.falhou.emit(str(e))
 
 
 class MainApp(QMainWindow):
@@ -174,14 +206,48 @@ class MainApp(QMainWindow):
         file_button.clicked.connect(self.load_file)
         self.e0_input = QLineEdit()
         self.e0_input.setPlaceholderText("Digite o valor de E0 (mol/L)")
-
-        run_button = QPushButton("Gerar Modelagem")
-        run_button.clicked.connect(self.run_modeling)
+        self.s0_a_input = QLineEdit()
+        self.s0_a_input.setPlaceholderText("Digite o valor de s0_a (mol/L)")
+        self.s0_b_input = QLineEdit()
+        self.s0_b_input.setPlaceholderText("Digite o valor de s0_b (mol/L)")
+        self.de_input = QLineEdit()
+        self.de_input.setPlaceholderText("maxiter, popsize[, inícios] (padrão: 1000, 15, 1)")
+
+        # Motor de ajuste (ver motores_ajuste); todos usam o mesmo modelo e integrador
+        self.motor_combo = QComboBox()
+        for nome, motor in (("DE", "de"), ("DE + mínimos quadrados", "hibrido"), ("Mínimos quadrados (TRF)", "trf")):
+            self.motor_combo.addItem(nome, motor)
+
+        # Espécies usadas no ajuste
+        adjust_layout = QHBoxLayout()
+        self.adjust_checks = {}
+        for chave, nome in (("S1_adjust", "S1"), ("S2_adjust", "S2"), ("P1_adjust", "P1"), ("P2_adjust", "P2")):
+            check = QCheckBox(nome)
+            check.setChecked(chave in ("P1_adjust", "P2_adjust"))
+            self.adjust_checks[chave] = check
+            adjust_layout.addWidget(check)
+
+        run_layout = QHBoxLayout()
+        self.run_button = QPushButton("Gerar Modelagem")
+        self.run_button.clicked.connect(self.run_modeling)
+        self.cancel_button = QPushButton("Cancelar")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_modeling)
+        run_layout.addWidget(self.run_button)
+        run_layout.addWidget(self.cancel_button)
+
+        self.progress_label = QLabel("")
 
         input_inner_layout.addWidget(self.file_label)
         input_inner_layout.addWidget(file_button)
         input_inner_layout.addWidget(self.e0_input)
-        input_inner_layout.addWidget(run_button)
+        input_inner_layout.addWidget(self.s0_a_input)
+        input_inner_layout.addWidget(self.s0_b_input)
+        input_inner_layout.addWidget(self.de_input)
+        input_inner_layout.addWidget(self.motor_combo)
+        input_inner_layout.addLayout(adjust_layout)
+        input_inner_layout.addLayout(run_layout)
+        input_inner_layout.addWidget(self.progress_label)
         input_group.setLayout(input_inner_layout)
 
         # Saída de K's
@@ -191,6 +257,17 @@ class MainApp(QMainWindow):
         self.parametros_output.setReadOnly(True)
         self.parametros_output.setPlaceholderText("Os parâmetros cinéticos aparecerão aqui...")
         output_inner_layout.addWidget(self.parametros_output)
+
+        # Constantes editadas à mão: redesenha as curvas sem refazer o ajuste
+        tweak_layout = QHBoxLayout()
+        self.k_input = QLineEdit()
+        self.k_input.setPlaceholderText("k1, k_1, k2, k3, k_3, k4")
+        self.k_input.returnPressed.connect(self.redraw_constants)
+        redraw_button = QPushButton("Redesenhar")
+        redraw_button.clicked.connect(self.redraw_constants)
+        tweak_layout.addWidget(self.k_input)
+        tweak_layout.addWidget(redraw_button)
+        output_inner_layout.addLayout(tweak_layout)
         output_group.setLayout(output_inner_layout)
 
         input_layout.addWidget(input_group, 50)
@@ -201,6 +278,10 @@ class MainApp(QMainWindow):
         graph_inner_layout = QVBoxLayout()
         self.figure_canvas = FigureCanvas(plt.figure())
         graph_inner_layout.addWidget(self.figure_canvas)
+        # Eixos e linhas criados uma vez; ajustes e edições só atualizam os dados
+        self.painel = PainelResultados(self.figure_canvas.figure, PAINEIS_TELA)
+        # Ajustes guardados entre sessões: repetir um ajuste igual não roda o otimizador de novo
+        self.banco = BancoResultados()
         graph_group.setLayout(graph_inner_layout)
 
         layout.addWidget(header)
@@ -223,7 +304,8 @@ class MainApp(QMainWindow):
     def load_file(self):
         options = QFileDialog.Options()
         file_name, _ = QFileDialog.getOpenFileName(
-            self, "Selecione o arquivo Excel", "", "Excel Files (*.xlsx; *.xls)", options=options
+            self, "Selecione o arquivo de dados", "",
+            "Dados (*.xlsx *.xls *.csv *.parquet);;Excel Files (*.xlsx *.xls)", options=options
         )
         if file_name:
             self.file_label.setText(f"Arquivo: {os.path.basename(file_name)}")
@@ -234,25 +316,101 @@ class MainApp(QMainWindow):
             if not hasattr(self, 'excel_file'):
                 raise FileNotFoundError("Selecione um arquivo Excel primeiro.")
             E0 = float(self.e0_input.text())
-
-            # Obter parâmetros e função de plotagem
-            params, plot_function = funcoes_modelagem.funcao_final(self.excel_file, E0)
-            k1, k2, k3, k4, Km_A, Km_B, Vmax = params
-
-            # Exibir os parâmetros cinéticos
-            self.parametros_output.setText(
-                f"k1: {k1:.4f}\nk2: {k2:.4f}\nk3: {k3:.4f}\nk4: {k4:.4f}\n"
-                f"Km_A: {Km_A:.4f}\nKm_B: {Km_B:.4f}\nVmax: {Vmax:.4f}"
-            )
-
-            # Atualizar o gráfico na mesma figura
-            self.figure_canvas.figure.clear()  # Limpa a figura existente
-            ax = self.figure_canvas.figure.add_subplot(111)  # Cria um único eixo na figura
-            plot_function(ax)  # Passa o eixo para a função de plotagem
-            self.figure_canvas.draw()  # Redesenha o gráfico na tela
-
+            s0_a = float(self.s0_a_input.text())
+            s0_b = float(self.s0_b_input.text())
+            maxiter, popsize, inicios = 1000, 15, 1
+            if self.de_input.text().strip():
+                valores = [int(x) for x in self.de_input.text().split(",")]
+                maxiter, popsize = valores[:2]
+                if len(valores) > 2:
+                    inicios = valores[2]
+            adjustments = {chave: check.isChecked() for chave, check in self.adjust_checks.items()}
+            if not any(adjustments.values()):
+                raise ValueError("Selecione pelo menos uma espécie para o ajuste.")
         except Exception as e:
             QMessageBox.critical(self, "Erro na Modelagem", str(e))
+            return
+
+        # Com vários inícios, DE e o híbrido viram buscas múltiplas (o híbrido refina a melhor)
+        motor = self.motor_combo.currentData()
+        refinamento = {} if motor == "hibrido" else None
+        if inicios > 1 and motor != "trf":
+            motor = "multiplo"
+
+        argumentos = dict(file_path=self.excel_file, E0=E0, s0_a=s0_a, s0_b=s0_b, adjustments=adjustments,
+                          maxiter=maxiter, popsize=popsize, mutation=(0.5, 1), recombination=0.7,
+                          refinamento=refinamento, cache=funcoes_modelagem.CACHE_SOLUCOES, banco=self.banco,
+                          multiplo={"inicios": inicios} if inicios > 1 else None, motor=motor)
+
+        # Curva de convergência desenhada ao vivo no painel existente
+        self.geracoes, self.melhores = [], []
+        self.condicoes = (E0, s0_a, s0_b)
+        self.painel.atualizar_convergencia(self.geracoes, self.melhores)
+
+        self.worker = ModelagemWorker(argumentos, self)
+        self.worker.progresso.connect(self.update_progress)
+        self.worker.concluido.connect(self.modeling_finished)
+        self.worker.falhou.connect(self.modeling_failed)
+        self.run_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.progress_label.setText("Ajustando...")
+        self.worker.start()
+
+    def cancel_modeling(self):
+        if getattr(self, 'worker', None) is not None:
+            self.worker.cancelar()
+            self.cancel_button.setEnabled(False)
+            self.progress_label.setText("Cancelando ao fim da geração atual...")
+
+    def update_progress(self, geracao, melhor, taxa):
+        self.progress_label.setText(f"Geração {geracao} | melhor objetivo {melhor:.4g} | {taxa:.0f} avaliações/s")
+        self.geracoes.append(geracao)
+        self.melhores.append(melhor)
+        self.painel.atualizar_convergencia(self.geracoes, self.melhores)
+
+    def modeling_finished(self, resultado):
+        cancelado = self.worker.cancelado
+        self._finish_worker()
+        if resultado.recuperado:
+            # Ajuste igual já feito antes: a convergência vem do histórico guardado
+            self.progress_label.setText("Ajuste recuperado do banco de resultados")
+            self.geracoes, self.melhores = list(range(1, len(resultado.historico) + 1)), resultado.historico
+        else:
+            self.progress_label.setText("Ajuste interrompido (melhor resultado parcial)" if cancelado else "Ajuste concluído")
+
+        # Exibir os parâmetros cinéticos
+        self.parametros_output.setText(resultado.resumo())
+
+        # Convergência e curvas ajustadas no mesmo painel, sem recriar a figura
+        self.resultado = resultado
+        self.k_input.setText(", ".join(f"{k:.4g}" for k in resultado.constantes))
+        self.painel.atualizar_convergencia(self.geracoes, self.melhores, desenhar=False)
+        self.painel.atualizar_resultado(resultado, self.condicoes[2])
+
+    def redraw_constants(self):
+        if getattr(self, 'resultado', None) is None:
+            return
+        try:
+            k_params = [float(x) for x in self.k_input.text().split(",")]
+            if len(k_params) != 6:
+                raise ValueError("Forneça as 6 constantes separadas por vírgulas.")
+        except ValueError as e:
+            QMessageBox.critical(self, "Erro nas Constantes", str(e))
+            return
+        E0, s0_a, s0_b = self.condicoes
+        self.painel.atualizar(series_parametros(self.resultado.time, k_params, E0, s0_a, s0_b,
+                                                self.resultado.experimental))
+
+    def modeling_failed(self, mensagem):
+        self._finish_worker()
+        self.progress_label.setText("")
+        QMessageBox.critical(self, "Erro na Modelagem", mensagem)
+
+    def _finish_worker(self):
+        self.worker.wait()
+        self.worker = None
+        self.run_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
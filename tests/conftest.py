@@ -0,0 +1,24 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Os módulos ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_modelagem import gerar_dados_sinteticos, K_VERDADEIRO
+from funcoes_modelagem_final import condicoes_iniciais
+
+
+@pytest.fixture(scope="session")
+def experimento():
+    """Experimento sintético pequeno com ruído: (time, y0, s0_a, s0_b, produto_1, produto_2)."""
+    e = gerar_dados_sinteticos(12, 1, K_VERDADEIRO, ruido=0.02)[0]
+    y0 = condicoes_iniciais(e["E0"], e["s0_a"], e["s0_b"], e["Produto 1"], e["Produto 2"])
+    return e["tempo"], y0, e["s0_a"], e["s0_b"], e["Produto 1"], e["Produto 2"]
+
+
+@pytest.fixture(scope="session")
+def constantes():
+    return np.array(K_VERDADEIRO, dtype=float)
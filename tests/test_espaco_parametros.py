@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from espaco_parametros import EspacoParametros
+from funcoes_modelagem_final import calculate_kinetics
+
+ADJUSTMENTS = {"P1_adjust": True, "P2_adjust": True}
+
+
+def test_diferenca_km_forma_vetorizada():
+    espaco = EspacoParametros("log", ordem_km="B<A")
+    x = np.log10(np.array([[1.0, 2.0], [0.5, 0.5], [1.0, 1.0], [2.0, 2.0], [0.1, 0.1], [1.0, 3.0]]))
+    assert np.ndim(espaco.diferenca_km(x[:, 0])) == 0
+    lote = espaco.diferenca_km(x)
+    assert lote.shape == (1, 2)
+    np.testing.assert_allclose(lote[0], [espaco.diferenca_km(x[:, 0]), espaco.diferenca_km(x[:, 1])])
+
+
+@pytest.mark.parametrize("ordem_km", ["A<B", "B<A"])
+def test_de_vetorizado_com_ordem_dos_km(experimento, ordem_km):
+    espaco = EspacoParametros("log", ordem_km=ordem_km)
+    result = calculate_kinetics(*experimento, ADJUSTMENTS, 3, 5, (0.5, 1), 0.7, seed=0, vectorized=True,
+                                refinamento={"maxiter_global": 3}, espaco=espaco)
+    assert result.x.shape == (6,)
+    assert espaco.respeita(espaco.para_otimizador(result.x))
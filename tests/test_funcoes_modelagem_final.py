@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from scipy.optimize import least_squares
+
+from funcoes_modelagem_final import (
+    ObjetivoCompilado, eq_dif, eq_dif_vetorizado, eq_dif_lote, jac_eq_dif, jac_eq_dif_lote, kinetic_model,
+    simular_sensibilidades,
+)
+
+SOLVER_PRECISO = {"method": "LSODA", "rtol": 1e-10, "atol": 1e-12}
+ADJUSTMENTS = {"P1_adjust": True, "P2_adjust": True}
+
+
+def estados_e_parametros(M, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 2, (8, M)), rng.uniform(0.01, 10, (M, 6))
+
+
+def test_eq_dif_vetorizado_igual_a_eq_dif():
+    y, params = estados_e_parametros(5)
+    esperado = np.column_stack([eq_dif(0, y[:, m], *params[m]) for m in range(5)])
+    np.testing.assert_allclose(eq_dif_vetorizado(0, y, params), esperado)
+    np.testing.assert_allclose(eq_dif_vetorizado(0, y[:, 0], params[0]), esperado[:, 0])
+
+
+def test_eq_dif_lote_igual_a_eq_dif():
+    y, params = estados_e_parametros(4, seed=1)
+    esperado = np.column_stack([eq_dif(0, y[:, m], *params[m]) for m in range(4)])
+    np.testing.assert_allclose(eq_dif_lote(0, y.ravel(), params), esperado.ravel())
+
+    # Bloco (m, m) do jacobiano esparso, no estado achatado (espécie, conjunto)
+    J = jac_eq_dif_lote(0, y.ravel(), params).toarray()
+    for m in range(4):
+        np.testing.assert_allclose(J[m::4, m::4], jac_eq_dif(0, y[:, m], *params[m]))
+
+
+#Derivada numérica (diferença central) de f em relação a cada componente de x
+def diferencas_finitas(f, x, passo=1e-6):
+    colunas = []
+    for j in range(len(x)):
+        h = passo * max(1.0, abs(x[j]))
+        dx = np.zeros_like(x)
+        dx[j] = h
+        colunas.append((np.asarray(f(x + dx)) - np.asarray(f(x - dx))) / (2 * h))
+    return np.stack(colunas, axis=-1)
+
+
+def test_jac_eq_dif_igual_a_diferencas_finitas():
+    y, params = estados_e_parametros(3, seed=2)
+    for m in range(3):
+        numerico = diferencas_finitas(lambda v: eq_dif(0, v, *params[m]), y[:, m])
+        np.testing.assert_allclose(jac_eq_dif(0, y[:, m], *params[m]), numerico, rtol=1e-6, atol=1e-8)
+
+
+def test_sensibilidades_iguais_a_diferencas_finitas(experimento, constantes):
+    time, y0 = experimento[:2]
+    y, S = simular_sensibilidades(time, constantes, y0, SOLVER_PRECISO)
+    numerico = diferencas_finitas(lambda k: kinetic_model(time, k, y0, SOLVER_PRECISO).y, constantes, 1e-5)
+    np.testing.assert_allclose(y, kinetic_model(time, constantes, y0, SOLVER_PRECISO).y, rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(S, numerico.transpose(0, 2, 1), rtol=1e-4, atol=1e-7)
+
+
+def test_jacobiano_do_objetivo_igual_a_diferencas_finitas(experimento, constantes):
+    for perda in (None, {"tipo": "relativo"}, {"tipo": "log"}):
+        objetivo = ObjetivoCompilado(*experimento, ADJUSTMENTS, SOLVER_PRECISO, perda)
+        numerico = diferencas_finitas(objetivo.residuos, constantes, 1e-5)
+        np.testing.assert_allclose(objetivo.jacobiano(constantes), numerico, rtol=1e-4, atol=1e-7)
+
+
+@pytest.mark.parametrize("perda", [{"tipo": "sse"}, {"tipo": "huber", "delta": 0.01}, {"tipo": "log"},
+                                   {"tipo": "relativo"}, {"tipo": "sse", "pesos": {"P2_adjust": 4.0}}])
+def test_objetivo_igual_ao_custo_do_least_squares(experimento, constantes, perda):
+    # aplicar_refinamento compara 2 * cost do least_squares com o erro do DE
+    objetivo = ObjetivoCompilado(*experimento, ADJUSTMENTS, perda=perda)
+    local = least_squares(objetivo.residuos, 1.5 * constantes, jac=objetivo.jacobiano, method="trf",
+                          loss=objetivo.perda_ls, f_scale=objetivo.delta, max_nfev=3)
+    np.testing.assert_allclose(objetivo(local.x), 2 * local.cost, rtol=1e-10)
+    # A avaliação em lote (DE vectorized) dá o mesmo erro de cada candidato
+    lote = objetivo(np.column_stack([local.x, constantes]))
+    np.testing.assert_allclose(lote, [objetivo(local.x), objetivo(constantes)], rtol=1e-6)
@@ -0,0 +1,29 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from funcoes_modelagem_final import condicoes_iniciais, kinetic_model
+from graficos_modelagem import PainelResultados, series_trajetoria
+
+
+def series(constantes, E0, s0_a, s0_b):
+    time = np.linspace(0, 60, 30)
+    y = kinetic_model(time, constantes, condicoes_iniciais(E0, s0_a, s0_b, [0.0], [0.0])).y
+    return series_trajetoria(time, y, 1.3, 0.75, E0 * 0.6, s0_b)
+
+
+def limites(lista):
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    painel = PainelResultados(figure, blit=False)
+    for s in lista:
+        painel.reiniciar()
+        painel.atualizar(s, desenhar=False)
+    return {nome: ax.get_xlim() + ax.get_ylim() for nome, ax in painel.eixos.items()}
+
+
+def test_reiniciar_nao_herda_limites(constantes):
+    grande, pequeno = series(constantes, 1.0, 10.0, 15.0), series(constantes, 0.01, 0.1, 0.15)
+    reaproveitado, novo = limites([grande, pequeno]), limites([pequeno])
+    for nome in novo:
+        np.testing.assert_allclose(reaproveitado[nome], novo[nome])